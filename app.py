@@ -8,7 +8,14 @@ from typing import Dict, Any, List
 import streamlit as st
 import pandas as pd
 from session_store import create_or_reset_session, end_session
-from graph_builder import build_graph
+from graph_builder import build_graph, MODE_TWO_STAGE, MODE_FUSED
+from batch_runner import iter_checkpointed_batch, summarize_state, DEFAULT_MAX_CONCURRENCY
+from shortlist import shortlist
+from dedup import duplicate_report, DEFAULT_THRESHOLD as DEFAULT_DEDUP_THRESHOLD
+from batch_store import create_batch, get_batch, list_batches, completed_rows, DONE
+from results_store import save_result, query_results, count_results, decision_counts, top_n, iter_csv
+from rate_limiter import limiter_stats
+from telemetry import load_traces, node_latency_summary, screening_summary
 from dotenv import load_dotenv
 
 # ------------------- ENVIRONMENT -------------------
@@ -37,7 +44,7 @@ def save_upload(file, dst_dir: Path) -> str:
     suffix = Path(file.name).suffix.lower()
     safe_name = f"{int(time.time())}_{Path(file.name).stem}{suffix}"
     path = dst_dir / safe_name
-    path.write_bytes(file.read())
+    path.write_bytes(file.getvalue())
     return str(path)
 
 def decision_badge(decision: str) -> str:
@@ -64,9 +71,9 @@ def pretty_score(score: Dict[str, Any]) -> pd.DataFrame:
     return pd.DataFrame(rows)
 
 @st.cache_resource(show_spinner=False)
-def ensure_graph():
-    """LangGraph 빌드 및 캐시"""
-    return build_graph()
+def ensure_graph(mode: str = MODE_TWO_STAGE):
+    """LangGraph 빌드 및 캐시 (평가 모드별)"""
+    return build_graph(mode=mode)
 
 # ------------------- SIDEBAR -------------------
 with st.sidebar:
@@ -78,10 +85,15 @@ with st.sidebar:
     with colA:
         if st.button("🚀 세션 생성/갱신", use_container_width=True, disabled=not chat_id or not job_file):
             with st.spinner("세션 초기화 중..."):
-                job_path = save_upload(job_file, REQ_DIR / chat_id)
-                create_or_reset_session(chat_id=chat_id, job_file_path=job_path)
+                info = create_or_reset_session(
+                    chat_id=chat_id, job_bytes=job_file.getvalue(), job_name=job_file.name,
+                )
                 st.session_state["chat_id"] = chat_id
             st.success(f"세션 생성됨: {chat_id}")
+            emb = info.get("embedding_cache", {})
+            st.caption(f"공고 임베딩 캐시 (이번 세션): hit {emb.get('hits', 0)} / miss {emb.get('misses', 0)}")
+            with st.expander("📋 추출된 요구사항 프로필"):
+                st.json(info.get("profile", {}))
 
     with colB:
         if st.button("🧹 세션 종료", use_container_width=True, disabled=not chat_id):
@@ -96,6 +108,15 @@ with st.sidebar:
             st.success("세션 종료 및 정리 완료")
 
     st.markdown("---")
+    bypass_cache = st.checkbox("♻️ 캐시 무시 (다시 평가)", value=False)
+    use_dedup = st.checkbox("🧬 유사 중복 이력서 결과 재사용", value=True)
+    dedup_threshold = st.slider(
+        "중복 판정 유사도", min_value=0.5, max_value=1.0, value=DEFAULT_DEDUP_THRESHOLD, step=0.05,
+    ) if use_dedup else None
+    graph_mode = st.radio(
+        "평가 모드", [MODE_TWO_STAGE, MODE_FUSED],
+        format_func=lambda m: "2단계 (추출 → 평가)" if m == MODE_TWO_STAGE else "단일 호출 (추출+평가)",
+    )
     st.caption("⚠️ 세션 동안 채용 공고 문맥이 유지됩니다. 세션을 종료하기 전까지 요구사항은 고정됩니다.")
 
 # ------------------- MAIN UI -------------------
@@ -103,7 +124,7 @@ st.title("🧠 HR AI Screening Agent — Streamlit UI")
 st.write("**1단계:** 사이드바에서 세션을 생성. **2단계:** 이력서를 평가.")
 
 # ------------------- 탭 구성 -------------------
-tab1, tab2, tab3 = st.tabs(["📄 단일 이력서", "📦 일괄 스크리닝", "📊 히스토리 / CSV"])
+tab1, tab2, tab3, tab4 = st.tabs(["📄 단일 이력서", "📦 일괄 스크리닝", "📊 히스토리 / CSV", "⏱️ 성능"])
 
 # ============ TAB 1: 단일 스크리닝 ============
 with tab1:
@@ -115,18 +136,32 @@ with tab1:
         run = st.button("⚖️ 평가하기")
         if run and resume_file:
             resume_path = save_upload(resume_file, RES_DIR / st.session_state["chat_id"])
-            compiled = ensure_graph()
+            compiled = ensure_graph(graph_mode)
             with st.spinner("평가 중..."):
                 try:
                     state = compiled.invoke({
                         "chat_id": st.session_state["chat_id"],
                         "resume_path": resume_path,
+                        "resume_bytes": resume_file.getvalue(),
+                        "resume_name": resume_file.name,
+                        "bypass_cache": bypass_cache,
+                        "dedup_threshold": dedup_threshold,
                     })
                 except Exception as e:
+                    save_result(st.session_state["chat_id"], Path(resume_path).name, {"decision": "ERROR", "reasons": [str(e)]})
                     st.error(f"에러: {e}")
                     st.stop()
 
+            save_result(st.session_state["chat_id"], Path(resume_path).name, state)
             st.success("✅ 평가 완료!")
+            comp = state.get("compression")
+            if comp:
+                st.caption(
+                    f"이력서 압축: {comp['tokens_before']} → {comp['tokens_after']} 토큰 "
+                    f"({comp['tokens_saved']} 토큰 절감)"
+                )
+            if state.get("duplicate_of"):
+                st.info(f"🧬 유사 중복 이력서 — {state['duplicate_of']}의 평가 결과를 재사용했습니다.")
 
             # 결과 표시
             c1, c2, c3 = st.columns([1, 1, 2])
@@ -160,7 +195,7 @@ with tab1:
                         st.markdown(f"- {r}")
 
             st.markdown("---")
-            st.json({k: v for k, v in state.items() if k not in ["resume_text"]})
+            st.json({k: v for k, v in state.items() if k not in ["resume_text", "resume_bytes"]})
 
 # ============ TAB 2: 일괄 스크리닝 ============
 with tab2:
@@ -169,30 +204,106 @@ with tab2:
         st.info("먼저 세션을 생성하세요.")
     else:
         files = st.file_uploader("이력서들 (.pdf/.txt)", type=["pdf", "txt"], accept_multiple_files=True)
+        max_concurrency = st.number_input(
+            "최대 동시 평가 수", min_value=1, max_value=64, value=DEFAULT_MAX_CONCURRENCY, step=1,
+        )
+        use_shortlist = st.checkbox("🔎 벡터 사전 선별 (공고 유사도 상위 후보만 LLM 평가)", value=False)
+        if use_shortlist:
+            c1, c2 = st.columns(2)
+            top_k = c1.number_input("상위 K명", min_value=1, value=200, step=10)
+            min_similarity = c2.number_input("최소 유사도 (0이면 미사용)", min_value=0.0, max_value=1.0, value=0.0, step=0.05)
         run_batch = st.button("🚀 일괄 평가")
+
+        # 중단된 배치 (미완료/오류 항목이 남은 배치) 이어서 실행
+        unfinished = list_batches(st.session_state["chat_id"], unfinished_only=True)
+        resume_id = None
+        if unfinished:
+            with st.expander(f"⏸️ 미완료 배치 {len(unfinished)}건"):
+                picked = st.selectbox(
+                    "배치 선택", unfinished,
+                    format_func=lambda b: (
+                        f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(b['created_at']))} — "
+                        f"완료 {b['counts'].get(DONE, 0)}/{b['total']}"
+                    ),
+                )
+                if st.button("▶️ 이어서 실행"):
+                    resume_id = picked["batch_id"]
+
+        batch_id = None
         if run_batch and files:
-            compiled = ensure_graph()
-            rows: List[Dict[str, Any]] = []
-            with st.spinner("일괄 평가 중..."):
-                for f in files:
-                    try:
-                        rp = save_upload(f, RES_DIR / st.session_state["chat_id"])
-                        s = compiled.invoke({"chat_id": st.session_state["chat_id"], "resume_path": rp})
-                        score = s.get("score") or {}
-                        total = score.get("total") if isinstance(score, dict) else None
-                        rows.append({
-                            "file": Path(rp).name,
-                            "decision": s.get("decision", ""),
-                            "total": total,
-                            "reasons": json.dumps(s.get("reasons", []), ensure_ascii=False),
-                        })
-                    except Exception as e:
-                        rows.append({"file": f.name, "decision": "ERROR", "total": "", "reasons": str(e)})
-            if rows:
-                df = pd.DataFrame(rows)
-                st.dataframe(df, use_container_width=True, hide_index=True)
-                csv = df.to_csv(index=False).encode("utf-8")
-                st.download_button("⬇️ CSV로 다운로드", csv, "screenings.csv", "text/csv")
+            names: List[str] = []
+            inputs: List[Dict[str, Any]] = []
+            for f in files:
+                rp = save_upload(f, RES_DIR / st.session_state["chat_id"])
+                names.append(Path(rp).name)
+                inputs.append({
+                    "chat_id": st.session_state["chat_id"],
+                    "resume_path": rp,
+                    "resume_name": f.name,
+                    "bypass_cache": bypass_cache,
+                    "dedup_threshold": dedup_threshold,
+                })
+            order = list(range(len(inputs)))
+            if use_shortlist:
+                with st.spinner("공고 유사도로 후보 순위화 중..."):
+                    order, rejected = shortlist(
+                        st.session_state["chat_id"], inputs,
+                        top_k=int(top_k), min_similarity=min_similarity or None,
+                    )
+                for idx, state in rejected.items():
+                    save_result(st.session_state["chat_id"], names[idx], state)
+                st.caption(f"사전 선별: {len(inputs)}명 중 {len(order)}명 LLM 평가, {len(rejected)}명 NOT_SHORTLISTED")
+            batch_id = create_batch(
+                st.session_state["chat_id"], [(names[i], inputs[i]) for i in order], options={"graph_mode": graph_mode},
+            )
+        elif resume_id:
+            batch_id = resume_id
+
+        if batch_id:
+            batch = get_batch(batch_id)
+            compiled = ensure_graph(batch["options"].get("graph_mode", MODE_TWO_STAGE))
+            rows: List[Dict[str, Any]] = [
+                {
+                    "file": r["file"],
+                    "decision": r.get("decision", ""),
+                    "total": r.get("total"),
+                    "tokens_saved": r.get("tokens_saved", 0),
+                    "reasons": json.dumps(r.get("reasons", []), ensure_ascii=False),
+                }
+                for r in completed_rows(batch_id)
+            ]
+            n_total = batch["total"]
+
+            progress = st.progress(len(rows) / n_total, text=f"일괄 평가 중... {len(rows)}/{n_total}")
+            table = st.empty()
+            for idx, name, s, err in iter_checkpointed_batch(compiled, batch_id, max_concurrency=max_concurrency):
+                save_result(
+                    st.session_state["chat_id"], name,
+                    s if err is None else {"decision": "ERROR", "reasons": [str(err)]},
+                    batch_id=batch_id, batch_idx=idx,
+                )
+                if err is not None:
+                    rows.append({"file": name, "decision": "ERROR", "total": "", "reasons": str(err)})
+                else:
+                    row = summarize_state(s)
+                    rows.append({
+                        "file": name,
+                        "decision": row["decision"],
+                        "total": row["total"],
+                        "tokens_saved": row["tokens_saved"],
+                        "reasons": json.dumps(row["reasons"], ensure_ascii=False),
+                    })
+                progress.progress(len(rows) / n_total, text=f"일괄 평가 중... {len(rows)}/{n_total}")
+                table.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+            progress.empty()
+            skipped = duplicate_report(st.session_state["chat_id"])
+            if skipped:
+                with st.expander(f"🧬 이 세션에서 중복으로 평가를 건너뛴 이력서 {len(skipped)}건"):
+                    st.dataframe(pd.DataFrame(skipped), use_container_width=True, hide_index=True)
+            st.caption(
+                "결과는 항목별로 저장되었습니다. 중단되면 '미완료 배치'에서 이어서 실행할 수 있고, "
+                "전체 결과 조회와 CSV 다운로드는 히스토리 탭에서 할 수 있습니다."
+            )
 
 # ============ TAB 3: 히스토리 / CSV ============
 with tab3:
@@ -200,12 +311,67 @@ with tab3:
     if "chat_id" not in st.session_state:
         st.info("세션을 생성하세요.")
     else:
-        sess_dir = RES_DIR / st.session_state["chat_id"]
-        if not sess_dir.exists():
-            st.write("아직 파일이 없습니다.")
+        hist_chat = st.session_state["chat_id"]
+        counts = decision_counts(hist_chat)
+        if not counts:
+            st.write("아직 저장된 평가 결과가 없습니다.")
         else:
-            files = sorted(sess_dir.glob("*"))
-            st.write(f"**{st.session_state['chat_id']}** 세션의 이력서 목록:")
-            for f in files:
-                st.markdown(f"- `{f.name}`")
-    st.caption("CSV 파일은 일괄 스크리닝 탭에서 내려받을 수 있습니다.")
+            st.write(f"**{hist_chat}** 세션 평가 결과: " + ", ".join(f"{k or '—'} {v}건" for k, v in counts.items()))
+
+            st.markdown("**🏆 점수 상위 10명**")
+            st.dataframe(
+                pd.DataFrame(top_n(hist_chat, 10), columns=["file", "decision", "total"]),
+                use_container_width=True, hide_index=True,
+            )
+
+            f1, f2, f3 = st.columns(3)
+            with f1:
+                decision_filter = st.selectbox("판정 필터", ["(전체)"] + sorted(counts))
+            with f2:
+                order_by = st.selectbox("정렬", ["recent", "total"], format_func=lambda o: "최신순" if o == "recent" else "점수순")
+            with f3:
+                page_size = st.selectbox("페이지 크기", [25, 50, 100], index=1)
+            decision_arg = None if decision_filter == "(전체)" else decision_filter
+            n_pages = max(1, -(-count_results(hist_chat, decision_arg) // page_size))
+            page = st.number_input(f"페이지 (1–{n_pages})", min_value=1, max_value=n_pages, value=1, step=1)
+
+            page_rows = query_results(hist_chat, page=page, page_size=page_size, decision=decision_arg, order_by=order_by)
+            st.dataframe(
+                pd.DataFrame(page_rows, columns=["id", "file", "decision", "total", "reasons", "created_at"]),
+                use_container_width=True, hide_index=True,
+            )
+
+            if st.button("📄 CSV 파일 생성"):
+                csv_path = OUT_DIR / f"{hist_chat}_screenings.csv"
+                with open(csv_path, "w", encoding="utf-8", newline="") as fh:
+                    for chunk in iter_csv(hist_chat, decision_arg):
+                        fh.write(chunk)
+                with open(csv_path, "rb") as fh:
+                    st.download_button("⬇️ CSV로 다운로드", fh, csv_path.name, "text/csv")
+
+# ============ TAB 4: 성능 ============
+with tab4:
+    st.subheader("⏱️ 파이프라인 성능 (노드별 지연 / 토큰 / 비용)")
+    traces = load_traces()
+    if "chat_id" in st.session_state and st.checkbox("현재 세션만 보기", value=True):
+        traces = [t for t in traces if t.get("chat_id") == st.session_state["chat_id"]]
+    if not traces:
+        st.write("아직 기록된 스크리닝이 없습니다.")
+    else:
+        summary = screening_summary(traces)
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("스크리닝 수", summary["screenings"])
+        m2.metric("p50 / p95 (ms)", f"{summary['p50_ms']:.0f} / {summary['p95_ms']:.0f}")
+        m3.metric("이력서당 토큰", summary["tokens_per_resume"])
+        hit_rate = summary["cache_hit_rate"]
+        m4.metric("캐시 hit율", f"{hit_rate:.0%}" if hit_rate is not None else "—")
+        st.caption(f"이력서당 예상 비용: ${summary['cost_per_resume_usd']:.5f}")
+        st.dataframe(node_latency_summary(traces), use_container_width=True, hide_index=True)
+
+    limits = limiter_stats()
+    if limits:
+        st.markdown("**OpenAI 호출 한도 (모델별 rate limiter)**")
+        st.dataframe(
+            pd.DataFrame([{"model": m, **v} for m, v in limits.items()]),
+            use_container_width=True, hide_index=True,
+        )
@@ -0,0 +1,131 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import batch_store
+from loader import load_resume_text
+from dedup import DuplicateGrouper
+
+# 동시에 실행할 그래프 호출 수 기본값 (OpenAI 호출은 I/O 대기 위주)
+DEFAULT_MAX_CONCURRENCY = 8
+
+# 풀 작업 종류: 이력서 텍스트 로드(중복 검사용) / 그래프 실행
+_LOAD, _RUN = "load", "run"
+
+
+def iter_batch(
+    compiled,
+    inputs: List[Dict[str, Any]],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[Exception]]]:
+    """
+    일괄 스크리닝 실행기
+    - build_graph()로 만든 컴파일된 그래프를 제한된 스레드 풀에서 병렬 호출한다.
+    - 항목별로 예외를 격리하여 한 이력서의 실패가 전체 배치를 멈추지 않는다.
+    - 완료되는 순서대로 결과를 yield 하므로 호출 측(UI)에서 즉시 렌더링할 수 있다.
+    - dedup_threshold가 지정된 배치는 이력서 텍스트를 같은 풀에서 로드하면서 유사 중복을 묶는다.
+      대표 이력서는 로드되는 즉시 평가를 시작하고, 중복은 대표 평가가 모두 끝난 뒤 실행하여
+      dedup 노드가 대표 결과를 재사용하게 한다.
+    - 풀에는 max_concurrency개까지만 제출하므로, 호출 측이 중간에 멈추면 실행 중인 호출만 끝나고
+      나머지는 시작되지 않는다.
+
+    입력:
+        compiled: 컴파일된 LangGraph
+        inputs: 그래프 입력 state 리스트
+        max_concurrency: 최대 동시 실행 수 (1 이상)
+    출력 (yield):
+        (입력 인덱스, 결과 state 또는 None, 예외 또는 None)
+    """
+    if not inputs:
+        return
+
+    workers = max(1, min(int(max_concurrency), len(inputs)))
+    threshold = next((inp["dedup_threshold"] for inp in inputs if inp.get("dedup_threshold")), None)
+    grouper = DuplicateGrouper(threshold) if threshold else None
+    held: List[int] = []  # 대표 평가가 끝난 뒤 실행할 중복 이력서
+    texts: Dict[int, str] = {}  # 중복 검사용으로 로드한 텍스트 (호출 측 입력 dict는 수정하지 않음)
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hr-batch")
+    pending: Dict[Any, Tuple[str, int]] = {}
+    # 풀에는 항상 workers개까지만 넣는다 (그래프 실행 우선, 남는 자리에 중복 검사용 로드)
+    to_run: deque = deque(() if grouper is not None else range(len(inputs)))
+    to_load: deque = deque(range(len(inputs)) if grouper is not None else ())
+    try:
+        while pending or to_run or to_load:
+            while len(pending) < workers and (to_run or to_load):
+                if to_run:
+                    i = to_run.popleft()
+                    inp = {**inputs[i], "resume_text": texts.pop(i)} if i in texts else inputs[i]
+                    pending[pool.submit(compiled.invoke, inp)] = (_RUN, i)
+                else:
+                    i = to_load.popleft()
+                    pending[pool.submit(_load_text, inputs[i])] = (_LOAD, i)
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                kind, idx = pending.pop(fut)
+                if kind == _LOAD:
+                    text = fut.result()
+                    if text is not None:
+                        texts[idx] = text
+                    (held if grouper.add(text or "") else to_run).append(idx)
+                    continue
+                try:
+                    yield idx, fut.result(), None
+                except Exception as e:
+                    yield idx, None, e
+            if not pending and not to_run and not to_load:
+                to_run.extend(held)
+                held = []
+    finally:
+        # 호출 측이 중간에 멈추면(GeneratorExit) 대기 중인 작업은 취소하고 기다리지 않는다
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _load_text(inp: Dict[str, Any]) -> Optional[str]:
+    """
+    (풀 스레드) 중복 검사용 이력서 텍스트 로드 — 그래프 실행 시 입력 사본의 resume_text로 넘긴다 (loader는 다시 읽지 않음).
+    - 이미 resume_text가 있는 항목은 그 값을 그대로 쓴다.
+    - 로드 실패는 None (그래프 실행 시 항목 오류로 보고된다)
+    """
+    if "resume_text" in inp:
+        return inp["resume_text"]
+    try:
+        return load_resume_text(inp)
+    except Exception:
+        return None
+
+
+def iter_checkpointed_batch(
+    compiled,
+    batch_id: str,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    retry_errors: bool = True,
+) -> Iterator[Tuple[int, str, Optional[Dict[str, Any]], Optional[Exception]]]:
+    """
+    batch_store에 등록된 배치를 체크포인트하며 실행 (중단된 배치 재개에도 사용)
+    - 완료되지 않은 항목만 실행하고, 호출 측이 결과를 처리한 뒤(다음 항목을 요청할 때) 완료로 기록한다.
+      처리 도중 중단되면 해당 항목은 다음 재개 때 다시 실행된다.
+
+    출력 (yield):
+        (항목 인덱스, 파일명, 결과 state 또는 None, 예외 또는 None)
+    """
+    items = batch_store.pending_items(batch_id, retry_errors=retry_errors)
+    inputs = [inp for _, _, inp in items]
+    for pos, state, err in iter_batch(compiled, inputs, max_concurrency=max_concurrency):
+        idx, file, _ = items[pos]
+        yield idx, file, state, err
+        if err is not None:
+            batch_store.mark_item(batch_id, idx, batch_store.ERROR, {"decision": "ERROR", "reasons": [str(err)]})
+        else:
+            batch_store.mark_item(batch_id, idx, batch_store.DONE, summarize_state(state))
+
+
+def summarize_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """그래프 결과 state를 배치 결과 테이블의 한 행으로 변환"""
+    score = state.get("score") or {}
+    total = score.get("total") if isinstance(score, dict) else None
+    return {
+        "decision": state.get("decision", ""),
+        "total": total,
+        "reasons": state.get("reasons", []),
+        "tokens_saved": (state.get("compression") or {}).get("tokens_saved", 0),
+    }
@@ -0,0 +1,142 @@
+"""
+일괄 스크리닝 체크포인트 저장소
+- 배치를 시작할 때 항목 목록(입력 state)을 먼저 저장하고, 항목이 끝날 때마다 상태를 기록한다.
+- 작업이 중단되면(429 폭주, Streamlit 워커 재시작 등) 완료되지 않은 항목만 다시 실행한다.
+- 다시 실행되는 항목의 로드된 텍스트/추출 결과는 loader.text_cache, extractor.extract_cache에서 재사용된다.
+"""
+import json
+import time
+import uuid
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from cache_store import DB_ROOT
+
+BATCH_DB = DB_ROOT / "batches.sqlite"
+
+# 항목 상태
+PENDING, DONE, ERROR = "pending", "done", "error"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    batch_id TEXT PRIMARY KEY,
+    chat_id TEXT NOT NULL,
+    options TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS batch_items (
+    batch_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    file TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (batch_id, idx)
+);
+CREATE INDEX IF NOT EXISTS idx_batches_chat ON batches(chat_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_batch_items_status ON batch_items(batch_id, status);
+"""
+
+_initialized = False
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    global _initialized
+    DB_ROOT.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(BATCH_DB), timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        if not _initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _initialized = True
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def create_batch(chat_id: str, items: List[Tuple[str, Dict[str, Any]]], options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    배치 등록 (실행 전에 호출)
+    - items: [(표시용 파일명, 그래프 입력 state)] — 입력은 JSON으로 저장되므로 resume_bytes 대신 resume_path를 사용
+    - options: 재개 시 동일하게 적용할 실행 옵션 (평가 모드 등)
+    """
+    batch_id = uuid.uuid4().hex
+    now = time.time()
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO batches(batch_id, chat_id, options, created_at) VALUES (?, ?, ?, ?)",
+            (batch_id, chat_id, json.dumps(options or {}, ensure_ascii=False), now),
+        )
+        conn.executemany(
+            "INSERT INTO batch_items(batch_id, idx, file, inputs, status, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (batch_id, i, file, json.dumps(inputs, ensure_ascii=False), PENDING, now)
+                for i, (file, inputs) in enumerate(items)
+            ],
+        )
+    return batch_id
+
+
+def get_batch(batch_id: str) -> Optional[Dict[str, Any]]:
+    """배치 정보와 상태별 항목 수"""
+    with _connect() as conn:
+        row = conn.execute("SELECT * FROM batches WHERE batch_id = ?", (batch_id,)).fetchone()
+        if row is None:
+            return None
+        counts = conn.execute(
+            "SELECT status, COUNT(*) AS n FROM batch_items WHERE batch_id = ? GROUP BY status", (batch_id,)
+        ).fetchall()
+    batch = dict(row)
+    batch["options"] = json.loads(batch["options"] or "{}")
+    batch["counts"] = {r["status"]: r["n"] for r in counts}
+    batch["total"] = sum(batch["counts"].values())
+    return batch
+
+
+def list_batches(chat_id: str, unfinished_only: bool = False, limit: int = 20) -> List[Dict[str, Any]]:
+    """세션의 최근 배치 목록 (unfinished_only=True면 미완료/오류 항목이 남은 배치만)"""
+    with _connect() as conn:
+        ids = [
+            r["batch_id"] for r in conn.execute(
+                "SELECT batch_id FROM batches WHERE chat_id = ? ORDER BY created_at DESC LIMIT ?", (chat_id, limit)
+            ).fetchall()
+        ]
+    batches = [get_batch(b) for b in ids]
+    if unfinished_only:
+        batches = [b for b in batches if b["counts"].get(DONE, 0) < b["total"]]
+    return batches
+
+
+def pending_items(batch_id: str, retry_errors: bool = True) -> List[Tuple[int, str, Dict[str, Any]]]:
+    """다시 실행할 항목 [(idx, 파일명, 입력 state)] — 기본적으로 오류 항목도 포함"""
+    statuses = (PENDING, ERROR) if retry_errors else (PENDING,)
+    with _connect() as conn:
+        rows = conn.execute(
+            f"SELECT idx, file, inputs FROM batch_items WHERE batch_id = ? AND status IN ({','.join('?' * len(statuses))})"
+            " ORDER BY idx",
+            (batch_id, *statuses),
+        ).fetchall()
+    return [(r["idx"], r["file"], json.loads(r["inputs"])) for r in rows]
+
+
+def mark_item(batch_id: str, idx: int, status: str, result: Optional[Dict[str, Any]] = None) -> None:
+    """항목 완료/오류 기록 — result는 결과 테이블 한 행 (summarize_state 결과 등)"""
+    with _connect() as conn:
+        conn.execute(
+            "UPDATE batch_items SET status = ?, result = ?, updated_at = ? WHERE batch_id = ? AND idx = ?",
+            (status, json.dumps(result, ensure_ascii=False) if result is not None else None, time.time(), batch_id, idx),
+        )
+
+
+def completed_rows(batch_id: str) -> List[Dict[str, Any]]:
+    """이미 끝난 항목의 결과 행 (재개 시 테이블을 미리 채우는 용도)"""
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT idx, file, status, result FROM batch_items WHERE batch_id = ? AND status = ? ORDER BY idx",
+            (batch_id, DONE),
+        ).fetchall()
+    return [{"idx": r["idx"], "file": r["file"], **json.loads(r["result"] or "{}")} for r in rows]
@@ -0,0 +1,385 @@
+"""
+오프라인 벤치마크
+- build_graph()로 만든 실제 그래프를 사용하되, OpenAI LLM/임베딩을
+  지연 시간을 설정할 수 있는 결정적 가짜(fake)로 교체하여 크레딧/네트워크 없이 처리량을 측정한다.
+- 합성 이력서/채용 공고 코퍼스를 크기별로 생성해 직렬 vs 병렬 일괄 처리를 비교한다.
+- 이력서 1건 지연(p50): 노드를 한 줄로 실행하는 그래프와 job_context/loader 분기를 병렬로 실행하는
+  그래프를 세션 캐시를 비운(cold) 상태에서 비교한다.
+
+실행:
+    python benchmark.py --sizes 20 100 --llm-latency 0.2 --concurrency 8 --out bench_report.json
+    python benchmark.py --baseline bench_report.json   # 기준 대비 처리량 회귀 시 exit 1
+"""
+import os
+import sys
+import atexit
+import shutil
+import json
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+from pathlib import Path
+
+# 프로젝트 모듈 import 전에 캐시/세션/trace 저장 위치를 임시 폴더로 격리
+_BENCH_ROOT = tempfile.mkdtemp(prefix="hr_bench_")
+os.environ["HR_AGENT_DB_ROOT"] = _BENCH_ROOT
+atexit.register(shutil.rmtree, _BENCH_ROOT, ignore_errors=True)
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+from langchain_core.embeddings import Embeddings, DeterministicFakeEmbedding
+from langchain_core.runnables import RunnableLambda
+
+import extractor
+import fused
+import llm_factory
+import rate_limiter
+import scorer
+import session_store
+import telemetry
+from batch_runner import iter_batch
+from graph_builder import build_graph
+from graph_builder import MODE_TWO_STAGE, MODE_FUSED
+from schemas import HRDecision, JobProfile, ResumeAssessment, ResumeExtract, ScoreBreakdown
+
+SKILL_POOL = [
+    "python", "sql", "pandas", "fastapi", "django", "docker", "kubernetes", "aws",
+    "java", "spark", "airflow", "react", "typescript", "go", "pytorch", "redis",
+]
+MUST_HAVE = ["python", "sql"]
+NICE_TO_HAVE = ["pandas", "fastapi", "docker"]
+CHAT_ID = "bench_session"
+LEGACY_CHAT_ID = "bench_session_legacy"
+# 캐시를 비운 상태에서 호출 1회 = LLM 왕복 1회인 노드
+LLM_NODES = ["extractor", "scorer", "fused"]
+
+
+# ------------------- FAKES -------------------
+def _rng(text: str) -> random.Random:
+    return random.Random(int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:16], 16))
+
+
+def _prompt_text(prompt_value) -> str:
+    return "\n".join(m.content for m in prompt_value.to_messages())
+
+
+class SlowFakeEmbeddings(Embeddings):
+    """지연 시간을 흉내 내는 결정적 임베딩"""
+
+    def __init__(self, latency: float, size: int = 256):
+        self.latency = latency
+        self.inner = DeterministicFakeEmbedding(size=size)
+
+    def embed_documents(self, texts):
+        time.sleep(self.latency)
+        return self.inner.embed_documents(texts)
+
+    def embed_query(self, text):
+        time.sleep(self.latency)
+        return self.inner.embed_query(text)
+
+
+def _fake_extract(latency: float):
+    def run(prompt_value) -> ResumeExtract:
+        time.sleep(latency)
+        text = _prompt_text(prompt_value).lower()
+        r = _rng(text)
+        years = [float(w[:-1]) for w in text.split() if w.endswith("y") and w[:-1].isdigit()]
+        return ResumeExtract(
+            name=f"candidate-{r.randint(0, 10**6)}",
+            summary="synthetic candidate",
+            years_experience=years[0] if years else None,
+            skills=[s for s in SKILL_POOL if f" {s}" in text],
+            education="BS Computer Science" if "university" in text else None,
+            recent_companies=["Acme"],
+            projects=["pipeline"],
+        )
+    return run
+
+
+def _fake_score(latency: float):
+    def run(prompt_value) -> HRDecision:
+        time.sleep(latency)
+        r = _rng(_prompt_text(prompt_value))
+        total = r.randint(40, 95)
+        return HRDecision(
+            decision="PASS" if total >= 70 else "REJECT",
+            reasons=["synthetic"],
+            improvements=[],
+            score=ScoreBreakdown(
+                skill_match=r.randint(0, 100), experience_match=r.randint(0, 100),
+                education_match=r.randint(0, 100), total=total,
+            ),
+        )
+    return run
+
+
+def _fake_profile(latency: float):
+    def run(prompt_value) -> JobProfile:
+        time.sleep(latency)
+        return JobProfile(
+            title="Backend Engineer", must_have_skills=MUST_HAVE, nice_to_have_skills=NICE_TO_HAVE,
+            min_years=2.0, education="BS", description="Build backend services in Python and SQL.",
+        )
+    return run
+
+
+def _fake_assess(latency: float):
+    extract, score = _fake_extract(0), _fake_score(0)
+
+    def run(prompt_value) -> ResumeAssessment:
+        time.sleep(latency)
+        return ResumeAssessment(extracted=extract(prompt_value), assessment=score(prompt_value))
+    return run
+
+
+class FakeRateLimitError(Exception):
+    """HTTP 429 흉내 (rate_limiter.is_rate_limit_error가 status_code로 인식)"""
+    status_code = 429
+
+
+class FakeChatModel:
+    """with_structured_output(schema)만 지원하는 가짜 채팅 모델 — 스키마별 결정적 응답"""
+
+    def __init__(self, latency: float, rate_limit_prob: float = 0.0):
+        self.rate_limit_prob = rate_limit_prob
+        self.handlers = {
+            ResumeExtract: _fake_extract(latency),
+            HRDecision: _fake_score(latency),
+            JobProfile: _fake_profile(latency),
+            ResumeAssessment: _fake_assess(latency),
+        }
+
+    def with_structured_output(self, schema):
+        handler = self.handlers[schema]
+
+        def run(prompt_value):
+            # 서버 429 흉내 — 요청 일부를 거절
+            if self.rate_limit_prob and random.random() < self.rate_limit_prob:
+                raise FakeRateLimitError("429 Too Many Requests")
+            return handler(prompt_value)
+        return RunnableLambda(run)
+
+
+def install_fakes(llm_latency: float, embed_latency: float, rate_limit_prob: float = 0.0) -> None:
+    """프롬프트는 그대로 두고 llm_factory가 만드는 모델/임베딩만 가짜로 교체"""
+    llm_factory.install(
+        chat_factory=lambda model, temperature: FakeChatModel(llm_latency, rate_limit_prob),
+        embeddings_factory=lambda model: SlowFakeEmbeddings(embed_latency),
+    )
+
+
+# ------------------- CORPUS -------------------
+def make_posting(paragraphs: int) -> str:
+    r = random.Random(0)
+    lines = ["Backend Engineer", "Requirements: Python, SQL, 2+ years.", "Nice to have: pandas, FastAPI, Docker."]
+    for i in range(paragraphs):
+        lines.append(" ".join(r.choice(SKILL_POOL) for _ in range(60)) + f" responsibility {i}.")
+    return "\n\n".join(lines)
+
+
+def make_resume(i: int, pages: int = 2) -> str:
+    r = random.Random(i)
+    skills = r.sample(SKILL_POOL, r.randint(2, 8))
+    body = [
+        f"Candidate {i}",
+        "Summary",
+        f"Engineer with {r.randint(0, 10)}y experience.",
+        "Experience",
+    ]
+    for p in range(pages * 15):
+        body.append(f"- Built {r.choice(SKILL_POOL)} service #{i}-{p} for team {r.randint(1, 99)}")
+    body += ["Skills", " " + " ".join(skills), "Education", r.choice(["State University BS", "Bootcamp"])]
+    return "\n".join(body)
+
+
+# ------------------- RUN -------------------
+def _reset_state() -> None:
+    for cache in (extractor.extract_cache, scorer.scorer_cache, fused.fused_cache):
+        cache.clear()
+    from loader import text_cache
+    text_cache.clear()
+    if telemetry.TRACE_FILE.exists():
+        telemetry.TRACE_FILE.unlink()
+
+
+def run_mode(compiled, inputs, mode: str, concurrency: int) -> dict:
+    _reset_state()
+    tracemalloc.start()
+    start = time.perf_counter()
+    errors = 0
+    if mode == "serial":
+        for inp in inputs:
+            try:
+                compiled.invoke(inp)
+            except Exception:
+                errors += 1
+    else:
+        for _, _, err in iter_batch(compiled, inputs, max_concurrency=concurrency):
+            errors += err is not None
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    traces = telemetry.load_traces(limit=len(inputs) * 2)
+    nodes = telemetry.node_latency_summary(traces)
+    return {
+        "mode": mode,
+        "resumes": len(inputs),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "resumes_per_sec": round(len(inputs) / elapsed, 3),
+        "peak_mem_mb": round(peak / 2**20, 2),
+        "llm_scored": int(nodes.loc[nodes["node"] == "scorer", "calls"].sum()) if not nodes.empty else 0,
+        "llm_round_trips": int(nodes.loc[nodes["node"].isin(LLM_NODES), "calls"].sum()) if not nodes.empty else 0,
+        "nodes": nodes[["node", "calls", "p50_ms", "p95_ms"]].to_dict(orient="records") if not nodes.empty else [],
+    }
+
+
+def run_latency(graph_mode: str, inputs, runs: int) -> dict:
+    """
+    이력서 1건 invoke 지연 p50 — 순차 그래프 vs 병렬 분기 그래프
+    - 결과/임베딩/세션 캐시를 매번 비운 cold 상태에서 측정
+    - profile: 요구사항 프로필이 있는 세션 (job_context = 파일 읽기)
+    - legacy: 프로필 없는 세션 (job_context = 세션 인덱스 로드 + 임베딩 검색)
+    """
+    out = {"graph": graph_mode, "runs": runs}
+    for scenario, chat_id in (("profile", CHAT_ID), ("legacy", LEGACY_CHAT_ID)):
+        res = {}
+        for parallel in (False, True):
+            compiled = build_graph(mode=graph_mode, instrument=False, parallel=parallel)
+            samples = []
+            for inp in inputs[:runs]:
+                _reset_state()
+                session_store._get_embeddings().cache.clear()
+                session_store.invalidate_session_cache()
+                t = time.perf_counter()
+                compiled.invoke({**inp, "chat_id": chat_id})
+                samples.append((time.perf_counter() - t) * 1000)
+            res["parallel_p50_ms" if parallel else "sequential_p50_ms"] = round(statistics.median(samples), 2)
+        res["speedup"] = round(res["sequential_p50_ms"] / res["parallel_p50_ms"], 3)
+        out[scenario] = res
+    return out
+
+
+def run_benchmark(
+    sizes, llm_latency, embed_latency, concurrency, posting_paragraphs,
+    graph_modes=(MODE_TWO_STAGE,), rpm=None, tpm=None, rate_limit_prob=0.0, latency_runs=10,
+) -> dict:
+    install_fakes(llm_latency, embed_latency, rate_limit_prob)
+    # 기본은 클라이언트 측 한도 없음 — --rpm/--tpm으로 계정 한도를 흉내 낸다
+    rate_limiter.configure("*", rpm=rpm, tpm=tpm)
+    work = Path(_BENCH_ROOT) / "corpus"
+    work.mkdir(parents=True, exist_ok=True)
+
+    posting = work / "posting.txt"
+    posting.write_text(make_posting(posting_paragraphs), encoding="utf-8")
+    t = time.perf_counter()
+    session_store.create_or_reset_session(CHAT_ID, str(posting))
+    session_seconds = time.perf_counter() - t
+    if latency_runs:
+        # 요구사항 프로필 도입 이전 세션 흉내 (job_context가 벡터 검색으로 문맥 구성)
+        session_store.create_or_reset_session(LEGACY_CHAT_ID, str(posting))
+        (session_store.SESS_DB_ROOT / LEGACY_CHAT_ID / session_store.PROFILE_FILE).unlink()
+
+    warmup = work / "warmup.txt"
+    warmup.write_text(make_resume(-1), encoding="utf-8")
+
+    results, latency = [], []
+    for graph_mode in graph_modes:
+        compiled = build_graph(mode=graph_mode)
+        # 지연 import/클라이언트 생성 비용이 첫 측정에 섞이지 않도록 1회 예열
+        compiled.invoke({"chat_id": CHAT_ID, "resume_path": str(warmup)})
+        for size in sizes:
+            inputs = []
+            for i in range(size):
+                p = work / f"resume_{size}_{i}.txt"
+                p.write_text(make_resume(i), encoding="utf-8")
+                inputs.append({"chat_id": CHAT_ID, "resume_path": str(p)})
+            for mode in ("serial", "concurrent"):
+                res = run_mode(compiled, inputs, mode, concurrency)
+                res.update(size=size, graph=graph_mode)
+                results.append(res)
+                print(f"[{graph_mode:>9} {mode:>10}] n={size:<5} {res['resumes_per_sec']:>8.2f} resumes/s  "
+                      f"peak {res['peak_mem_mb']:.1f} MB  LLM round-trips {res['llm_round_trips']}")
+        if latency_runs:
+            lat = run_latency(graph_mode, inputs, latency_runs)
+            latency.append(lat)
+            for scenario in ("profile", "legacy"):
+                r = lat[scenario]
+                print(f"[{graph_mode:>9} {scenario:>10}] 이력서 1건 p50 순차 {r['sequential_p50_ms']:.1f} ms -> "
+                      f"병렬 분기 {r['parallel_p50_ms']:.1f} ms (x{r['speedup']})")
+
+    return {
+        "config": {
+            "sizes": sizes, "llm_latency": llm_latency, "embed_latency": embed_latency,
+            "concurrency": concurrency, "posting_paragraphs": posting_paragraphs,
+            "graph_modes": list(graph_modes),
+            "rpm": rpm, "tpm": tpm, "rate_limit_prob": rate_limit_prob,
+            "latency_runs": latency_runs,
+        },
+        "session_create_seconds": round(session_seconds, 3),
+        "results": results,
+        "single_resume_latency": latency,
+        "rate_limits": rate_limiter.limiter_stats(),
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """같은 (graph, size, mode)에서 처리량이 tolerance 이상 떨어진 항목 리스트"""
+    def key(r):
+        return r.get("graph", MODE_TWO_STAGE), r["size"], r["mode"]
+
+    base = {key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in report["results"]:
+        b = base.get(key(r))
+        if b and r["resumes_per_sec"] < b["resumes_per_sec"] * (1 - tolerance):
+            regressions.append({
+                "graph": r["graph"], "size": r["size"], "mode": r["mode"],
+                "baseline": b["resumes_per_sec"], "current": r["resumes_per_sec"],
+            })
+    return regressions
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="HR 스크리닝 그래프 오프라인 벤치마크")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[20, 100])
+    ap.add_argument("--llm-latency", type=float, default=0.2, help="가짜 LLM 호출 1회 지연(초)")
+    ap.add_argument("--embed-latency", type=float, default=0.05, help="가짜 임베딩 호출 1회 지연(초)")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--posting-paragraphs", type=int, default=20)
+    ap.add_argument(
+        "--graph-modes", nargs="+", default=[MODE_TWO_STAGE], choices=[MODE_TWO_STAGE, MODE_FUSED],
+        help="비교할 그래프 모드 (2단계 / 단일 호출)",
+    )
+    ap.add_argument("--rpm", type=float, help="클라이언트 측 분당 요청 한도 (기본: 없음)")
+    ap.add_argument("--tpm", type=float, help="클라이언트 측 분당 토큰 한도 (기본: 없음)")
+    ap.add_argument("--rate-limit-prob", type=float, default=0.0, help="가짜 LLM이 429를 반환할 확률")
+    ap.add_argument("--latency-runs", type=int, default=10, help="이력서 1건 지연 측정 횟수 (0이면 생략)")
+    ap.add_argument("--out", default="bench_report.json")
+    ap.add_argument("--baseline", help="비교할 이전 리포트(JSON)")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="허용 처리량 감소 비율")
+    args = ap.parse_args(argv)
+
+    report = run_benchmark(
+        args.sizes, args.llm_latency, args.embed_latency, args.concurrency, args.posting_paragraphs,
+        args.graph_modes, args.rpm, args.tpm, args.rate_limit_prob, args.latency_runs,
+    )
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        report["regressions"] = compare(report, baseline, args.tolerance)
+
+    Path(args.out).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"report -> {args.out}")
+    if report.get("regressions"):
+        print(f"처리량 회귀 {len(report['regressions'])}건: {report['regressions']}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
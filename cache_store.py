@@ -0,0 +1,125 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+DB_ROOT = Path(os.getenv("HR_AGENT_DB_ROOT", str(ROOT / "db")))
+CACHE_DIR = DB_ROOT / "cache"
+
+# 조회마다 (캐시 이름, hit 여부)로 호출되는 콜백 — telemetry가 등록
+lookup_hooks: List[Callable[[str, bool], None]] = []
+
+# 쓰기 N회마다 한 번씩 만료/용량 정리를 수행
+_EVICT_EVERY = 50
+
+
+def make_key(*parts) -> str:
+    """캐시 키 생성 — 입력 조각들을 구분자로 이어 SHA-256 해시"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+class SQLiteCache:
+    """
+    SQLite 기반 영속 키-값 캐시
+    - 값은 문자열(JSON 직렬화된 결과)로 저장
+    - max_age_days 보다 오래된 항목과 max_entries 초과분(가장 오래 조회되지 않은 순)을 정리
+    - 조회 hit/miss 카운터 제공
+    - 호출마다 새 커넥션을 열어 여러 스레드에서 안전하게 사용
+    """
+
+    def __init__(self, name: str, max_entries: int = 10000, max_age_days: float = 30.0):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 86400
+        self.path = CACHE_DIR / f"{name}.sqlite"
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] <= self.max_age_seconds:
+                conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            else:
+                row = None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        for hook in lookup_hooks:
+            hook(self.name, row is not None)
+        return None if row is None else row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache(key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+        with self._lock:
+            self._writes += 1
+            due = self._writes % _EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """만료 항목 및 용량 초과 항목 삭제, 삭제 건수 반환"""
+        with self._connect() as conn:
+            removed = conn.execute(
+                "DELETE FROM cache WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+            ).rowcount
+            count = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                removed += conn.execute(
+                    "DELETE FROM cache WHERE key IN ("
+                    " SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,),
+                ).rowcount
+        return removed
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache")
+
+    def stats(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
@@ -0,0 +1,182 @@
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from loader import PAGE_BREAK
+
+# 이력서 1건당 추출 프롬프트에 넣을 최대 토큰 수 기본값
+DEFAULT_TOKEN_BUDGET = 3000
+
+# 섹션 헤더 키워드 -> 섹션 종류
+SECTION_KEYWORDS = {
+    "experience": ["experience", "work history", "employment", "career", "경력", "경험", "근무"],
+    "skills": ["skills", "technical skills", "tech stack", "competencies", "기술", "스킬", "역량"],
+    "education": ["education", "academic", "학력", "교육"],
+    "summary": ["summary", "profile", "objective", "about me", "요약", "소개"],
+    "projects": ["projects", "프로젝트"],
+    "certifications": ["certifications", "certificates", "licenses", "자격", "수상", "awards"],
+    "publications": ["publications", "papers", "conferences", "논문", "발표"],
+    "references": ["references", "referees", "추천인"],
+}
+
+# 예산이 부족할 때 먼저 보존하는 순서 (앞쪽일수록 중요)
+SECTION_PRIORITY = [
+    "header", "experience", "skills", "education", "summary",
+    "projects", "certifications", "publications", "references",
+]
+
+# 페이지 번호 모양 (페이지 가장자리 줄에서만 제거 — 본문의 연도 "2018" 등은 보존)
+PAGE_NUMBER_PATTERNS = [
+    re.compile(r"^(page\s*)?\d{1,3}\s*(of|/)\s*\d{1,3}$", re.I),
+    re.compile(r"^page\s*\d{1,3}$", re.I),
+    re.compile(r"^[-–—\s]*\d{1,3}[-–—\s]*$"),
+]
+
+# 평가에 의미 없는 상투 문구
+BOILERPLATE_PATTERNS = [
+    re.compile(r"^references? (are )?available (up)?on request\.?$", re.I),
+    re.compile(r"^i hereby declare.*$", re.I),
+    re.compile(r"^(curriculum vitae|resume|이력서)$", re.I),
+]
+
+# 페이지 위/아래 몇 줄을 머리글/바닥글 후보로 볼지
+_EDGE_LINES = 2
+
+
+@lru_cache(maxsize=1)
+def _encoder():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # 인코딩 파일을 내려받을 수 없는 환경 → 근사치 사용
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """gpt-4o 계열 토큰 수 (tiktoken 사용 불가 시 문자 수 기반 근사)"""
+    enc = _encoder()
+    if enc is not None:
+        return len(enc.encode(text))
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars)
+
+
+def _repeated_edges(pages: List[List[str]]) -> set:
+    """여러 페이지의 위/아래 가장자리에 반복되는 줄(머리글/바닥글) 집합"""
+    if len(pages) < 2:
+        return set()
+    counts: Counter = Counter()
+    for lines in pages:
+        body = [ln for ln in lines if ln]
+        counts.update(set(body[:_EDGE_LINES] + body[-_EDGE_LINES:]))
+    min_pages = max(2, (len(pages) + 1) // 2)
+    return {ln for ln, c in counts.items() if c >= min_pages}
+
+
+def normalize_text(text: str) -> List[str]:
+    """공백 정규화 + 반복 머리글/바닥글/페이지 번호/상투 문구 제거 후 줄 리스트 반환"""
+    pages = [
+        [re.sub(r"[ \t\u00a0\u3000]+", " ", ln).strip() for ln in page.splitlines()]
+        for page in text.split(PAGE_BREAK)
+    ]
+    repeated = _repeated_edges(pages)
+
+    out: List[str] = []
+    for page_no, lines in enumerate(pages):
+        body = [i for i, ln in enumerate(lines) if ln]
+        edges = set(body[:_EDGE_LINES] + body[-_EDGE_LINES:])
+        for i, ln in enumerate(lines):
+            # 반복 머리글/바닥글은 2페이지부터 가장자리에서만 제거 (첫 페이지의 이름/연락처·섹션 헤더는 보존)
+            if page_no > 0 and i in edges and ln in repeated:
+                continue
+            if any(p.match(ln) for p in BOILERPLATE_PATTERNS):
+                continue
+            if i in edges and any(p.match(ln) for p in PAGE_NUMBER_PATTERNS):
+                continue
+            if not ln and (not out or not out[-1]):
+                continue  # 연속 빈 줄 축소
+            out.append(ln)
+    while out and not out[-1]:
+        out.pop()
+    return out
+
+
+def _section_of(line: str):
+    """헤더 줄이면 섹션 종류 반환, 아니면 None"""
+    if not line or len(line) > 40:
+        return None
+    key = line.lower().strip(" :#*-•")
+    for section, words in SECTION_KEYWORDS.items():
+        if any(key == w or key.startswith(w + " ") for w in words):
+            return section
+    return None
+
+
+def split_sections(lines: List[str]) -> List[Tuple[str, List[str]]]:
+    """줄 리스트를 (섹션 종류, 줄들) 순서 리스트로 분할"""
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+    for ln in lines:
+        kind = _section_of(ln)
+        if kind is not None:
+            sections.append((kind, [ln]))
+        else:
+            sections[-1][1].append(ln)
+    return [(k, body) for k, body in sections if any(body)]
+
+
+def compress_resume_text(text: str, token_budget: int = DEFAULT_TOKEN_BUDGET) -> Tuple[str, Dict[str, int]]:
+    """
+    이력서 텍스트를 토큰 예산 안으로 압축
+    - 공백 정규화, 반복 머리글/바닥글 및 상투 문구 제거
+    - 예산 초과 시 중요 섹션(경력/기술/학력)을 우선 보존하고 나머지를 줄 단위로 잘라냄
+    - 섹션의 원래 순서는 유지
+    출력: (압축 텍스트, {"tokens_before", "tokens_after", "tokens_saved"})
+    """
+    tokens_before = count_tokens(text)
+    lines = normalize_text(text)
+    compressed = "\n".join(lines)
+
+    if count_tokens(compressed) > token_budget:
+        sections = split_sections(lines)
+        order = sorted(
+            range(len(sections)),
+            key=lambda i: SECTION_PRIORITY.index(sections[i][0]),
+        )
+        kept: Dict[int, List[str]] = {}
+        remaining = token_budget
+        for i in order:
+            body: List[str] = []
+            for ln in sections[i][1]:
+                cost = count_tokens(ln) + 1
+                if cost > remaining:
+                    break
+                body.append(ln)
+                remaining -= cost
+            # 본문 없이 헤더만 남은 섹션은 버리고 예산을 돌려받음
+            if len(body) == 1 and len(sections[i][1]) > 1 and _section_of(body[0]):
+                remaining += count_tokens(body[0]) + 1
+            elif body:
+                kept[i] = body
+        compressed = "\n".join("\n".join(kept[i]) for i in sorted(kept))
+
+    tokens_after = count_tokens(compressed)
+    return compressed, {
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": max(tokens_before - tokens_after, 0),
+    }
+
+
+def compressor_node(state: Dict) -> Dict:
+    """
+    이력서 압축 노드 (loader와 extractor 사이)
+    입력:
+        state["resume_text"]: 로더가 읽은 원본 텍스트
+        state["resume_token_budget"](선택): 토큰 예산
+    출력:
+        {"resume_text": 압축 텍스트, "compression": 토큰 절감 통계}
+    """
+    budget = state.get("resume_token_budget", DEFAULT_TOKEN_BUDGET)
+    text, stats = compress_resume_text(state["resume_text"], budget)
+    return {"resume_text": text, "compression": stats}
@@ -0,0 +1,297 @@
+"""
+유사 중복 이력서 탐지 (MinHash + LSH)
+- 같은 지원자가 파일명/전화번호만 바꾸거나 PDF를 다시 내보낸 이력서를 세션 단위로 묶는다.
+- 로드된 텍스트의 단어 shingle로 MinHash 서명을 만들고, LSH 밴드 버킷으로 후보를 찾은 뒤
+  추정 자카드 유사도가 임계값 이상이면 대표 이력서의 평가 결과를 재사용한다 (extractor 호출 생략).
+- 서명과 대표 결과는 db/dedup.sqlite에 세션(chat_id)별로 저장되어 배치 간에도 유지된다.
+  결과는 평가 조건(그래프 모드, 호출 측 평가 기준, 임계값) 해시와 함께 저장되어 조건이 같을 때만 재사용한다.
+  채용 공고가 바뀌면(create_or_reset_session / end_session) 해당 세션 인덱스를 비운다.
+"""
+import re
+import json
+import time
+import sqlite3
+import hashlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+import numpy as np
+from cache_store import DB_ROOT, make_key
+
+DEDUP_DB = DB_ROOT / "dedup.sqlite"
+
+# 유사도 임계값 기본값 (추정 자카드 유사도)
+DEFAULT_THRESHOLD = 0.9
+# MinHash 순열 수 = BANDS * ROWS (밴드 32 x 4행 → 유사도 약 0.4 이상부터 후보로 잡힘)
+BANDS, ROWS = 32, 4
+NUM_PERM = BANDS * ROWS
+# 단어 shingle 길이
+SHINGLE_SIZE = 5
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, (1 << 32) - 1, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, (1 << 32) - 1, size=NUM_PERM, dtype=np.uint64)
+
+# 평가 결과에 영향을 주는 state 키 (scorer/fused 캐시 키 입력과 동일한 기준)
+# - 공고 문맥/프로필은 chat_id로 정해지고 공고가 바뀌면 세션 인덱스를 비우므로 해시에 넣지 않는다.
+CRITERIA_KEYS = (
+    "min_years", "required_education", "must_have_skills", "nice_to_have_skills",
+    "threshold", "prescore_margin",
+)
+
+# 연락처/날짜 등 숫자는 서명에서 제외 (전화번호만 바뀐 이력서도 같은 문서로 취급)
+_TOKEN = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dedup_docs (
+    doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id TEXT NOT NULL,
+    file TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    result TEXT,
+    criteria TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dedup_bands (
+    chat_id TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    doc_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dedup_skips (
+    chat_id TEXT NOT NULL,
+    file TEXT NOT NULL,
+    duplicate_of TEXT NOT NULL,
+    similarity REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dedup_bands ON dedup_bands(chat_id, bucket);
+CREATE INDEX IF NOT EXISTS idx_dedup_bands_doc ON dedup_bands(doc_id);
+CREATE INDEX IF NOT EXISTS idx_dedup_docs_file ON dedup_docs(chat_id, file);
+CREATE INDEX IF NOT EXISTS idx_dedup_skips ON dedup_skips(chat_id, created_at);
+"""
+
+_initialized = False
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    global _initialized
+    DB_ROOT.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(DEDUP_DB), timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        if not _initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            # criteria 컬럼 도입 이전 DB — 기존 행(NULL)은 어떤 조건과도 일치하지 않는다
+            if "criteria" not in {r["name"] for r in conn.execute("PRAGMA table_info(dedup_docs)")}:
+                conn.execute("ALTER TABLE dedup_docs ADD COLUMN criteria TEXT")
+            _initialized = True
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+# ------------------- MinHash -------------------
+def shingles(text: str) -> set:
+    """소문자 단어 SHINGLE_SIZE-gram 집합 (숫자/구두점 제외)"""
+    words = _TOKEN.findall(text.lower())
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def signature(text: str) -> Optional[np.ndarray]:
+    """
+    MinHash 서명 (NUM_PERM,) uint64
+    - 단어가 없는 텍스트(텍스트 레이어 없는 스캔 PDF 등)는 None — 서로 다른 빈 이력서가
+      유사도 1.0으로 묶이지 않도록 중복 검사 대상에서 제외한다.
+    """
+    sh = shingles(text)
+    if not sh:
+        return None
+    hv = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in sh),
+        dtype=np.uint64, count=len(sh),
+    )
+    # (a*x + b) mod p 해시 족 — uint64 오버플로는 의도된 wrap-around
+    phv = ((hv[:, None] * _A + _B) % _MERSENNE) & _MAX_HASH
+    return phv.min(axis=0)
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """추정 자카드 유사도"""
+    return float(np.mean(sig_a == sig_b))
+
+
+def _buckets(sig: np.ndarray) -> List[str]:
+    return [
+        f"{b}:{hashlib.blake2b(sig[b * ROWS:(b + 1) * ROWS].tobytes(), digest_size=8).hexdigest()}"
+        for b in range(BANDS)
+    ]
+
+
+# ------------------- 세션 인덱스 -------------------
+def criteria_key(state: Dict, mode: str) -> str:
+    """
+    평가 조건 해시 — 그래프 모드 + state에 이미 있는 평가 기준/임계값/사전 점수 마진
+    - dedup은 job_context보다 먼저(병렬 분기 이전에) 실행되므로 세션 프로필을 읽지 않는다.
+      호출 측이 기준을 직접 지정한 경우에만 그 값이 해시에 들어간다.
+    """
+    return make_key(mode, json.dumps({k: state.get(k) for k in CRITERIA_KEYS}, sort_keys=True, ensure_ascii=False))
+
+
+def find_duplicate(
+    chat_id: str, sig: np.ndarray, threshold: float, criteria: str, exclude_file: str = "",
+) -> Optional[Dict[str, Any]]:
+    """
+    평가 조건이 같고 결과가 저장된 가장 유사한 대표 이력서 ({file, similarity, result}) 또는 None
+    - exclude_file: 같은 파일을 다시 평가할 때 자기 자신을 중복으로 잡지 않도록 제외할 파일명
+    """
+    buckets = _buckets(sig)
+    with _connect() as conn:
+        rows = conn.execute(
+            f"SELECT DISTINCT d.doc_id, d.file, d.signature, d.result FROM dedup_bands b"
+            f" JOIN dedup_docs d ON d.doc_id = b.doc_id"
+            f" WHERE b.chat_id = ? AND b.bucket IN ({','.join('?' * len(buckets))})"
+            f" AND d.result IS NOT NULL AND d.criteria = ? AND d.file != ?",
+            (chat_id, *buckets, criteria, exclude_file),
+        ).fetchall()
+    best = None
+    for r in rows:
+        sim = similarity(sig, np.frombuffer(r["signature"], dtype=np.uint64))
+        if sim >= threshold and (best is None or sim > best["similarity"]):
+            best = {"file": r["file"], "similarity": round(sim, 3), "result": json.loads(r["result"])}
+    return best
+
+
+def add_document(chat_id: str, file: str, sig: np.ndarray, result: Dict[str, Any], criteria: str) -> None:
+    """대표 이력서 서명과 평가 결과 등록 (criteria: criteria_key 해시) — 같은 파일의 이전 등록은 교체"""
+    with _connect() as conn:
+        old = [r["doc_id"] for r in conn.execute(
+            "SELECT doc_id FROM dedup_docs WHERE chat_id = ? AND file = ? AND criteria = ?", (chat_id, file, criteria),
+        )]
+        for doc_id in old:
+            conn.execute("DELETE FROM dedup_bands WHERE doc_id = ?", (doc_id,))
+            conn.execute("DELETE FROM dedup_docs WHERE doc_id = ?", (doc_id,))
+        cur = conn.execute(
+            "INSERT INTO dedup_docs(chat_id, file, signature, result, criteria, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                chat_id, file, np.asarray(sig, dtype=np.uint64).tobytes(),
+                json.dumps(result, ensure_ascii=False), criteria, time.time(),
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO dedup_bands(chat_id, bucket, doc_id) VALUES (?, ?, ?)",
+            [(chat_id, b, cur.lastrowid) for b in _buckets(np.asarray(sig, dtype=np.uint64))],
+        )
+
+
+def record_skip(chat_id: str, file: str, duplicate_of: str, sim: float) -> None:
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO dedup_skips(chat_id, file, duplicate_of, similarity, created_at) VALUES (?, ?, ?, ?, ?)",
+            (chat_id, file, duplicate_of, sim, time.time()),
+        )
+
+
+def duplicate_report(chat_id: str, limit: int = 500) -> List[Dict[str, Any]]:
+    """평가를 건너뛴 중복 이력서 목록 (최신순)"""
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT file, duplicate_of, similarity, created_at FROM dedup_skips WHERE chat_id = ?"
+            " ORDER BY created_at DESC LIMIT ?",
+            (chat_id, limit),
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def clear_session(chat_id: str) -> None:
+    """세션 인덱스 삭제 (채용 공고가 바뀌면 대표 결과를 재사용할 수 없음)"""
+    with _connect() as conn:
+        conn.execute("DELETE FROM dedup_bands WHERE chat_id = ?", (chat_id,))
+        conn.execute("DELETE FROM dedup_docs WHERE chat_id = ?", (chat_id,))
+        conn.execute("DELETE FROM dedup_skips WHERE chat_id = ?", (chat_id,))
+
+
+class DuplicateGrouper:
+    """
+    배치 안의 유사 중복을 순서대로 묶는 인메모리 LSH 인덱스
+    - add(text)는 앞서 추가된 대표와 threshold 이상 유사하면 True(중복)를 반환하고,
+      아니면 해당 텍스트를 새 대표로 등록한 뒤 False를 반환한다.
+    - 서명 없는(단어가 없는) 텍스트는 항상 대표로 취급한다.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._sigs: List[np.ndarray] = []
+        self._buckets: Dict[str, List[int]] = {}
+
+    def add(self, text: str) -> bool:
+        sig = signature(text)
+        if sig is None:
+            return False
+        keys = _buckets(sig)
+        cands = {j for k in keys for j in self._buckets.get(k, [])}
+        if any(similarity(sig, self._sigs[j]) >= self.threshold for j in cands):
+            return True
+        self._sigs.append(sig)
+        for k in keys:
+            self._buckets.setdefault(k, []).append(len(self._sigs) - 1)
+        return False
+
+
+# ------------------- 그래프 노드 -------------------
+def _file_of(state: Dict) -> str:
+    return state.get("resume_name") or Path(state.get("resume_path") or "").name
+
+
+def dedup_node(state: Dict, mode: str = "two_stage") -> Dict:
+    """
+    유사 중복 검사 노드 (loader 다음, extractor 이전)
+    - mode: 그래프 모드 (2단계/단일 호출 결과는 서로 재사용하지 않음)
+    - state["dedup_threshold"]가 없거나 bypass_cache면 아무것도 하지 않는다.
+    - 텍스트에서 단어를 뽑을 수 없는 이력서도 검사하지 않는다 (다른 빈 이력서와 묶이지 않도록).
+    - 중복이면 대표 이력서의 decision/score/reasons/improvements를 그대로 반환한다.
+    """
+    threshold = state.get("dedup_threshold")
+    if not threshold or state.get("bypass_cache"):
+        return {}
+    sig = signature(state.get("resume_text", ""))
+    if sig is None:
+        return {}
+    criteria = criteria_key(state, mode)
+    dup = find_duplicate(state["chat_id"], sig, threshold, criteria, exclude_file=_file_of(state))
+    if dup is None:
+        return {"minhash": sig.tolist(), "dedup_criteria": criteria}
+
+    result = dup["result"]
+    record_skip(state["chat_id"], _file_of(state), dup["file"], dup["similarity"])
+    return {
+        "duplicate_of": dup["file"],
+        "decision": result.get("decision", ""),
+        "score": result.get("score"),
+        "reasons": [f"중복 이력서: {dup['file']}와 유사도 {dup['similarity']:.2f} — 평가 결과 재사용"]
+        + list(result.get("reasons") or []),
+        "improvements": result.get("improvements") or [],
+    }
+
+
+def route_after_dedup(state: Dict) -> str:
+    """조건부 엣지: 중복이면 평가 생략"""
+    return "duplicate" if state.get("duplicate_of") else "continue"
+
+
+def dedup_record_node(state: Dict) -> Dict:
+    """평가가 끝난 대표 이력서를 세션 인덱스에 등록"""
+    sig = state.get("minhash")
+    if sig and state.get("decision") and state.get("dedup_criteria"):
+        add_document(
+            state["chat_id"], _file_of(state), np.asarray(sig, dtype=np.uint64),
+            {k: state.get(k) for k in ("decision", "score", "reasons", "improvements")},
+            state["dedup_criteria"],
+        )
+    return {}
@@ -0,0 +1,59 @@
+import base64
+from typing import Dict, List, Tuple
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from cache_store import SQLiteCache, make_key
+
+
+def _encode(vec: List[float]) -> str:
+    return base64.b64encode(np.asarray(vec, dtype=np.float32).tobytes()).decode("ascii")
+
+
+def _decode(value: str) -> List[float]:
+    return np.frombuffer(base64.b64decode(value), dtype=np.float32).tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    내용 해시 기반 영속 임베딩 캐시
+    - (모델명, 텍스트) 해시를 키로 벡터를 SQLite에 저장
+    - 캐시에 없는 텍스트만 모아 한 번에 원본 임베딩 모델로 요청
+    """
+
+    def __init__(self, underlying: Embeddings, model: str):
+        self.underlying = underlying
+        self.model = model
+        self.cache = SQLiteCache("embeddings", max_entries=200000, max_age_days=180)
+
+    def _key(self, text: str) -> str:
+        return make_key(self.model, text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents_counted(texts)[0]
+
+    def embed_documents_counted(self, texts: List[str]) -> Tuple[List[List[float]], Dict[str, int]]:
+        """임베딩 + 이번 호출의 캐시 hit/miss 건수 (세션별 통계 표시용)"""
+        vectors: List = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            cached = self.cache.get(self._key(text))
+            if cached is not None:
+                vectors[i] = _decode(cached)
+            else:
+                missing.setdefault(text, []).append(i)
+
+        if missing:
+            new_texts = list(missing)
+            for text, vec in zip(new_texts, self.underlying.embed_documents(new_texts)):
+                self.cache.set(self._key(text), _encode(vec))
+                for i in missing[text]:
+                    vectors[i] = vec
+        misses = sum(len(idx) for idx in missing.values())
+        return vectors, {"hits": len(texts) - misses, "misses": misses}
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def stats(self) -> Dict[str, int]:
+        """프로세스 전체 캐시 hit/miss 및 저장 건수"""
+        return self.cache.stats()
@@ -1,7 +1,9 @@
+import re
 from typing import Dict
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
+from llm_factory import get_structured_model
 from schemas import ResumeExtract
+from cache_store import SQLiteCache, make_key
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -26,19 +28,52 @@ extract_prompt = ChatPromptTemplate.from_messages([
     ),
 ])
 
-llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=0)
+MODEL_NAME = "gpt-4o-mini"
+# 프롬프트/스키마 변경 시 올려서 기존 추출 캐시를 무효화
+PROMPT_VERSION = "v1"
 
-# 구조화된 출력(ResumeExtract) 강제
-extract_chain = extract_prompt | llm.with_structured_output(ResumeExtract)
+def get_extract_chain():
+    """구조화된 출력(ResumeExtract)을 강제한 추출 체인 (LLM 클라이언트는 첫 호출 시 생성)"""
+    return extract_prompt | get_structured_model(MODEL_NAME, ResumeExtract)
+
+# 이력서 내용 기반(content-addressed) 추출 결과 캐시
+extract_cache = SQLiteCache("extract", max_entries=20000, max_age_days=90)
+
+def _normalize(text: str) -> str:
+    """공백 차이로 캐시가 갈리지 않도록 정규화"""
+    return re.sub(r"\s+", " ", text or "").strip()
 
 def extractor_node(state: Dict) -> Dict:
     """
     이력서 추출 노드
+    - 정규화된 이력서 텍스트 + 모델명 + 프롬프트 버전 해시로 캐시를 조회하고,
+      캐시에 없을 때만 LLM을 호출한다.
     입력:
       - state['resume_text']: 원본 이력서 텍스트
     출력:
       - {'extracted': ResumeExtract}
     """
-    extracted: ResumeExtract = extract_chain.invoke({'resume_text': state['resume_text']})
+    key, cached = _lookup(state)
+    if cached is not None:
+        return {"extracted": cached}
+
+    extracted: ResumeExtract = get_extract_chain().invoke({'resume_text': state['resume_text']})
+    extract_cache.set(key, extracted.model_dump_json())
     return {"extracted": extracted}
 
+async def aextractor_node(state: Dict) -> Dict:
+    """extractor_node의 비동기 버전 (ainvoke 실행 시 LLM 호출을 이벤트 루프에서 대기)"""
+    key, cached = _lookup(state)
+    if cached is not None:
+        return {"extracted": cached}
+
+    extracted: ResumeExtract = await get_extract_chain().ainvoke({'resume_text': state['resume_text']})
+    extract_cache.set(key, extracted.model_dump_json())
+    return {"extracted": extracted}
+
+def _lookup(state: Dict):
+    """(캐시 키, 캐시된 ResumeExtract 또는 None)"""
+    key = make_key(MODEL_NAME, PROMPT_VERSION, _normalize(state['resume_text']))
+    cached = extract_cache.get(key)
+    return key, (ResumeExtract.model_validate_json(cached) if cached is not None else None)
+
@@ -0,0 +1,86 @@
+import json
+from typing import Dict
+from langchain_core.prompts import ChatPromptTemplate
+from llm_factory import get_structured_model
+from schemas import ResumeAssessment
+from scorer import scorer_system
+from cache_store import SQLiteCache, make_key
+
+# 추출 + 평가를 한 번에 수행하는 프롬프트 (2단계 extractor/scorer 프롬프트를 합친 형태)
+fused_prompt = ChatPromptTemplate.from_messages([
+    ("system", scorer_system + " 먼저 이력서 텍스트에서 구조화된 정보를 정확히 추출한 뒤 그 정보로 평가하세요."),
+    (
+        "human",
+        "채용 공고:\n```\n{job_description}\n```\n\n"
+        "최소 경력 연차: {min_years}\n"
+        "학력 요건: {required_education}\n"
+        "Must-have 스킬: {must_have_skills}\n"
+        "Nice-to-have 스킬: {nice_to_have_skills}\n"
+        "PASS 임계값(종합 점수): {threshold}\n\n"
+        "이력서 텍스트:\n'''{resume_text}'''\n\n"
+        "반환 형식:\n"
+        "- extracted: name, summary, years_experience(float), skills(소문자 정규화 리스트), "
+        "education, recent_companies, projects\n"
+        "- assessment: PASS 또는 REJECT, 사유(reasons), 개선점(improvements), "
+        "점수 상세(score: skill_match, experience_match, education_match, total)"
+    ),
+])
+
+MODEL_NAME = "gpt-4o-mini"
+# 프롬프트/스키마 변경 시 올려서 기존 캐시를 무효화
+PROMPT_VERSION = "v1"
+
+# 단일 호출 결과 캐시 (입력이 모두 같으면 재사용)
+fused_cache = SQLiteCache("fused", max_entries=20000, max_age_days=30)
+
+def get_fused_chain():
+    """ResumeAssessment 구조화 출력 체인 (LLM 클라이언트는 첫 호출 시 생성)"""
+    return fused_prompt | get_structured_model(MODEL_NAME, ResumeAssessment)
+
+def fused_node(state: Dict) -> Dict:
+    """
+    추출+평가 단일 호출 노드 (build_graph(mode="fused"))
+    - extractor와 scorer를 거치지 않고 LLM 왕복 1회로 extracted와 판단을 함께 얻는다.
+    입력 state:
+      - resume_text, job_description, min_years, required_education,
+        must_have_skills, nice_to_have_skills, threshold, bypass_cache(선택)
+    출력:
+      - extracted, decision, reasons, improvements, score
+    """
+    inputs, key, result = _lookup(state)
+    if result is None:
+        result = get_fused_chain().invoke(inputs)
+        fused_cache.set(key, result.model_dump_json())
+    return _output(result)
+
+async def afused_node(state: Dict) -> Dict:
+    """fused_node의 비동기 버전 (ainvoke 실행 시 LLM 호출을 이벤트 루프에서 대기)"""
+    inputs, key, result = _lookup(state)
+    if result is None:
+        result = await get_fused_chain().ainvoke(inputs)
+        fused_cache.set(key, result.model_dump_json())
+    return _output(result)
+
+def _lookup(state: Dict):
+    """(체인 입력, 캐시 키, 캐시된 ResumeAssessment 또는 None) — bypass_cache면 캐시 무시"""
+    inputs = {
+        "job_description": state["job_description"],
+        "min_years": state["min_years"],
+        "required_education": state.get("required_education") or "명시되지 않음",
+        "must_have_skills": state["must_have_skills"],
+        "nice_to_have_skills": state["nice_to_have_skills"],
+        "threshold": state.get("threshold", 70),
+        "resume_text": state["resume_text"],
+    }
+    key = make_key(MODEL_NAME, PROMPT_VERSION, json.dumps(inputs, sort_keys=True, ensure_ascii=False))
+    cached = None if state.get("bypass_cache") else fused_cache.get(key)
+    return inputs, key, (ResumeAssessment.model_validate_json(cached) if cached is not None else None)
+
+def _output(result: ResumeAssessment) -> Dict:
+    return {
+        "extracted": result.extracted,
+        "decision": result.assessment.decision,
+        "reasons": result.assessment.reasons,
+        "improvements": result.assessment.improvements,
+        "score": result.assessment.score.model_dump(),
+    }
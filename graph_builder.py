@@ -1,10 +1,22 @@
+import asyncio
+import operator
+from functools import partial
+from typing import Annotated
 from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
+from langchain_core.runnables import RunnableLambda
 
 from job_context import job_context_node  # 세션별 채용공고 문맥 구성 노드
+from session_store import load_job_profile
 from loader import loader_node            # 이력서 파일 로더 노드
-from extractor import extractor_node      # 텍스트 -> 구조화 추출 노드
-from scorer import scorer_node            # 점수화/판단 노드
+from compressor import compressor_node    # 토큰 예산 기반 이력서 압축 노드
+from extractor import extractor_node, aextractor_node  # 텍스트 -> 구조화 추출 노드 (동기/비동기)
+from prescore import prescore_node, route_after_prescore, DEFAULT_MARGIN, ROUTE_PASS  # 규칙 기반 사전 점수 노드
+from scorer import scorer_node, ascorer_node  # 점수화/판단 노드 (동기/비동기)
+from fused import fused_node, afused_node  # 추출+평가 단일 호출 노드 (동기/비동기)
+from dedup import dedup_node, dedup_record_node, route_after_dedup  # 유사 중복 이력서 결과 재사용
+from telemetry import instrument_node, TracedGraph  # 노드별 지연/토큰/비용 계측
 
 class HRState(TypedDict, total=False):
     """
@@ -13,49 +25,238 @@ class HRState(TypedDict, total=False):
     """
     chat_id: str
     resume_path: str
+    resume_bytes: bytes
+    resume_name: str
     job_description: str
     min_years: float
     must_have_skills: list[str]
     nice_to_have_skills: list[str]
+    required_education: str
     threshold: int
     resume_text: str
+    similarity: float
+    dedup_threshold: float
+    minhash: list[int]
+    dedup_criteria: str
+    duplicate_of: str
+    resume_token_budget: int
+    compression: dict
     extracted: dict
+    prescore_margin: float
+    prescore: dict
     decision: str
     reasons: list[str]
     improvements: list[str]
     score: dict
+    bypass_cache: bool
 
-def build_graph():
+MODE_TWO_STAGE, MODE_FUSED = "two_stage", "fused"
+
+def build_graph(compress: bool = True, instrument: bool = True, mode: str = MODE_TWO_STAGE, parallel: bool = True):
     """
     LangGraph 빌드:
-    START -> defaults -> job_context -> loader -> extractor -> scorer -> END
+    START -> defaults -> loader -> dedup -> [compressor] -┬-> extractor ---┬-> prescore -> (경계 후보만) scorer -> dedup_record -> END
+                                                          └-> job_context -┘
+    - 서로 독립적인 extractor(LLM 호출)와 job_context(세션 프로필/문맥 로드)를 같은 단계에서 병렬로 실행하고,
+      평가 기준이 필요한 prescore 앞에서 합류한다. 중복 이력서(dedup -> END)는 job_context도 건너뛴다.
+    - mode="fused"면 extractor/prescore/scorer 대신 fused 노드 1개로 추출+평가 (LLM 왕복 1회)
+      fused는 시작부터 평가 기준이 필요하므로 job_context를 loader와 같은 단계에서 병렬로 실행한다.
+      START -> defaults -┬-> loader -> dedup -> [compressor] -> fused -> dedup_record -> END
+                         └-> job_context
+    - dedup: state["dedup_threshold"]가 있으면 세션 내 유사 중복 이력서의 결과를 재사용하고 바로 END
+    - compress=False면 압축 노드 없이 원문을 그대로 추출에 사용
+    - instrument=True면 노드별 시간/토큰/비용/캐시 hit을 db/traces/screenings.jsonl에 기록
+    - parallel=False면 defaults -> job_context -> loader -> ... 순서로 한 줄 실행 (벤치마크 비교용)
+    - LLM 노드는 비동기 구현을 함께 등록하여 ainvoke(헤드리스 서비스)에서 스레드를 점유하지 않는다.
     """
     g = StateGraph(HRState)
 
+    def add(name, fn, afn=None):
+        if instrument:
+            fn = instrument_node(name, fn)
+            afn = instrument_node(name, afn) if afn else None
+        g.add_node(name, RunnableLambda(fn, afunc=afn, name=name) if afn else fn)
+
     # --- 노드 등록 ---
-    g.add_node("defaults", _defaults_node)
-    g.add_node("job_context", job_context_node)
-    g.add_node("loader", loader_node)
-    g.add_node("extractor", extractor_node)
-    g.add_node("scorer", scorer_node)
+    add("defaults", _defaults_node)
+    add("job_context", job_context_node)
+    add("loader", loader_node)
+    add("dedup", partial(dedup_node, mode=mode))
+    if compress:
+        add("compressor", compressor_node)
+    if mode == MODE_FUSED:
+        add("fused", fused_node, afused_node)
+    else:
+        add("extractor", extractor_node, aextractor_node)
+        add("prescore", prescore_node)
+        add("scorer", scorer_node, ascorer_node)
+    add("dedup_record", dedup_record_node)
 
     # --- 엣지(흐름) ---
     g.add_edge(START, "defaults")
-    g.add_edge("defaults", "job_context")
-    g.add_edge("job_context", "loader")
-    g.add_edge("loader", "extractor")
-    g.add_edge("extractor", "scorer")
-    g.add_edge("scorer", END)
+    fused_mode = mode == MODE_FUSED
+    if not parallel:
+        g.add_edge("defaults", "job_context")
+        g.add_edge("job_context", "loader")
+    elif fused_mode:
+        # job_context는 loader와 같은 단계에서 끝나므로 fused 실행 시점엔 기준이 이미 state에 있다
+        g.add_edge("defaults", "job_context")
+        g.add_edge("defaults", "loader")
+    else:
+        g.add_edge("defaults", "loader")
+    g.add_edge("loader", "dedup")
+
+    first = "fused" if fused_mode else "extractor"
+    # 2단계 병렬 모드: 추출과 job_context를 같은 단계에서 시작
+    branches = [first, "job_context"] if parallel and not fused_mode else [first]
+    if compress:
+        g.add_conditional_edges("dedup", route_after_dedup, {"continue": "compressor", "duplicate": END})
+        for b in branches:
+            g.add_edge("compressor", b)
+    else:
+        g.add_conditional_edges(
+            "dedup", lambda s: branches if route_after_dedup(s) == "continue" else END, branches + [END],
+        )
+
+    if fused_mode:
+        g.add_edge("fused", "dedup_record")
+    else:
+        if parallel:
+            g.add_edge(["extractor", "job_context"], "prescore")
+        else:
+            g.add_edge("extractor", "prescore")
+        g.add_conditional_edges("prescore", route_after_prescore, {"scorer": "scorer", "done": "dedup_record"})
+        g.add_edge("scorer", "dedup_record")
+    g.add_edge("dedup_record", END)
 
-    return g.compile()
+    compiled = g.compile()
+    return TracedGraph(compiled) if instrument else compiled
 
 def _defaults_node(state: HRState) -> HRState:
     """
     기본값 설정 노드
     - 그래프 초기에 누락된 설정을 안전하게 채움
+    - 평가 기준(스킬/경력/학력)은 job_context 노드가 세션 프로필에서 채움
     """
-    state.setdefault("min_years", 1.0)
     state.setdefault("threshold", 70)
-    state.setdefault("must_have_skills", ["python", "sql"])
-    state.setdefault("nice_to_have_skills", ["pandas", "fastapi"])
+    state.setdefault("prescore_margin", DEFAULT_MARGIN)
     return state
+
+# ------------------- 다중 포지션 매칭 -------------------
+class MultiPositionState(TypedDict, total=False):
+    """
+    다중 포지션 그래프 상태
+    - chat_ids: 매칭할 채용 공고 세션 목록
+    - matches: 포지션별 평가 결과 (병렬 노드 결과가 리스트로 합쳐짐)
+    - positions: 종합 점수 순으로 정렬된 최종 결과
+    """
+    chat_ids: list[str]
+    resume_path: str
+    resume_bytes: bytes
+    resume_name: str
+    resume_text: str
+    resume_token_budget: int
+    compression: dict
+    extracted: dict
+    threshold: int
+    prescore_margin: float
+    bypass_cache: bool
+    matches: Annotated[list[dict], operator.add]
+    positions: list[dict]
+
+# 포지션 노드로 전달하는 공통 키
+_POSITION_KEYS = ("extracted", "threshold", "prescore_margin", "bypass_cache")
+
+def build_multi_position_graph(compress: bool = True, instrument: bool = True):
+    """
+    이력서 1건을 여러 채용 공고 세션에 매칭하는 그래프
+    START -> defaults -> loader -> [compressor] -> extractor -> position x N (병렬) -> rank -> END
+    - 로드/압축/추출은 1회만 수행하고, ResumeExtract를 세션마다 평가한다.
+    - position: 세션별 job_context -> prescore -> (경계 후보만) scorer
+    - ainvoke로 실행하면 포지션별 scorer LLM 호출이 이벤트 루프에서 동시에 진행된다.
+    """
+    g = StateGraph(MultiPositionState)
+
+    def add(name, fn, afn=None):
+        if instrument:
+            fn = instrument_node(name, fn)
+            afn = instrument_node(name, afn) if afn else None
+        g.add_node(name, RunnableLambda(fn, afunc=afn, name=name) if afn else fn)
+
+    add("defaults", _defaults_node)
+    add("loader", loader_node)
+    if compress:
+        add("compressor", compressor_node)
+    add("extractor", extractor_node, aextractor_node)
+    add("position", _position_node, _aposition_node)
+    add("rank", _rank_node)
+
+    g.add_edge(START, "defaults")
+    g.add_edge("defaults", "loader")
+    if compress:
+        g.add_edge("loader", "compressor")
+        g.add_edge("compressor", "extractor")
+    else:
+        g.add_edge("loader", "extractor")
+    g.add_conditional_edges("extractor", _fan_out_positions, ["position"])
+    g.add_edge("position", "rank")
+    g.add_edge("rank", END)
+
+    compiled = g.compile()
+    return TracedGraph(compiled) if instrument else compiled
+
+def _fan_out_positions(state: MultiPositionState):
+    """조건부 엣지: 세션마다 position 노드를 병렬 실행 (Send)"""
+    shared = {k: state[k] for k in _POSITION_KEYS if k in state}
+    return [Send("position", {**shared, "chat_id": chat_id}) for chat_id in state.get("chat_ids", [])]
+
+def _position_node(state: HRState) -> MultiPositionState:
+    """
+    포지션 1개 평가 노드
+    - 단일 그래프와 같은 job_context -> prescore -> scorer 흐름을 세션 문맥으로 실행
+    - 한 세션의 오류가 다른 포지션 평가를 막지 않도록 ERROR 결과로 기록
+    """
+    s = dict(state)
+    try:
+        s.update(job_context_node(s))
+        s.update(prescore_node(s))
+        if route_after_prescore(s) == "scorer":
+            s.update(scorer_node(s))
+        profile = load_job_profile(s["chat_id"])
+    except Exception as e:
+        return _position_error(s["chat_id"], e)
+    return _position_result(s, profile)
+
+async def _aposition_node(state: HRState) -> MultiPositionState:
+    """포지션 평가 노드 (비동기) — 세션 문맥/프로필 로드는 스레드에서, scorer는 비동기 호출"""
+    s = dict(state)
+    try:
+        s.update(await asyncio.to_thread(job_context_node, s))
+        s.update(prescore_node(s))
+        if route_after_prescore(s) == "scorer":
+            s.update(await ascorer_node(s))
+        profile = await asyncio.to_thread(load_job_profile, s["chat_id"])
+    except Exception as e:
+        return _position_error(s["chat_id"], e)
+    return _position_result(s, profile)
+
+def _position_error(chat_id: str, e: Exception) -> MultiPositionState:
+    return {"matches": [{"chat_id": chat_id, "title": "", "decision": "ERROR", "reasons": [str(e)], "score": None}]}
+
+def _position_result(s: HRState, profile) -> MultiPositionState:
+    return {"matches": [{
+        "chat_id": s["chat_id"],
+        "title": profile.title if profile is not None else "",
+        "decision": s.get("decision", ""),
+        "score": s.get("score"),
+        "reasons": s.get("reasons") or [],
+        "improvements": s.get("improvements") or [],
+    }]}
+
+def _rank_node(state: MultiPositionState) -> MultiPositionState:
+    """포지션 결과를 합격 여부, 종합 점수 순으로 정렬"""
+    def key(m):
+        total = (m.get("score") or {}).get("total") or 0
+        return (m.get("decision") == ROUTE_PASS, total)
+
+    return {"positions": sorted(state.get("matches", []), key=key, reverse=True)}
@@ -1,24 +1,51 @@
 from typing import Dict
-from session_store import retrieve_job_context
+from session_store import load_job_profile, retrieve_job_context
+
+# 프로필이 없는(이전 버전) 세션에서 사용할 기본 요구사항
+DEFAULT_MIN_YEARS = 1.0
+DEFAULT_MUST_HAVE = ["python", "sql"]
+DEFAULT_NICE_TO_HAVE = ["pandas", "fastapi"]
 
 def job_context_node(state: Dict) -> Dict:
     """
     채용 공고 문맥 노드
-    - 세션 ID(chat_id)를 기반으로 저장된 벡터 DB(Chroma)에서
-      채용 공고 문맥을 검색하여 job_description 필드로 반환한다.
+    - 세션 생성 시 저장된 요구사항 프로필(profile.json)을 불러와
+      job_description 및 평가 기준 필드로 반환한다.
+    - 호출 측이 state에 직접 지정한 기준이 있으면 그 값을 우선한다.
+    - 프로필이 없는 세션은 FAISS 검색 문맥과 기본 요구사항으로 대체한다.
     
     입력:
         state["chat_id"]: 세션 ID
     출력:
-        {"job_description": str}
+        {"job_description": str, "min_years", "must_have_skills",
+         "nice_to_have_skills", "required_education"} 중 state에 없는 항목
     """
     chat_id = state.get("chat_id")
     if not chat_id:
         raise ValueError("chat_id가 누락되었습니다. 세션이 생성되지 않았습니다.")
 
-    # 세션 DB에서 채용 공고 문맥 검색
-    job_desc = retrieve_job_context(chat_id)
+    profile = load_job_profile(chat_id)
+    if profile is not None:
+        job_desc = profile.description
+        criteria = {
+            "min_years": profile.min_years if profile.min_years is not None else 0.0,
+            "must_have_skills": profile.must_have_skills,
+            "nice_to_have_skills": profile.nice_to_have_skills,
+            "required_education": profile.education or "",
+        }
+    else:
+        # 세션 DB에서 채용 공고 문맥 검색
+        job_desc = retrieve_job_context(chat_id)
+        criteria = {
+            "min_years": DEFAULT_MIN_YEARS,
+            "must_have_skills": DEFAULT_MUST_HAVE,
+            "nice_to_have_skills": DEFAULT_NICE_TO_HAVE,
+            "required_education": "",
+        }
+
     if not job_desc or len(job_desc.strip()) == 0:
         job_desc = "No job description found in session context."
 
-    return {"job_description": job_desc}
+    out = {k: v for k, v in criteria.items() if k not in state}
+    out["job_description"] = job_desc
+    return out
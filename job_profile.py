@@ -0,0 +1,35 @@
+from langchain_core.prompts import ChatPromptTemplate
+from llm_factory import get_structured_model
+from schemas import JobProfile
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 채용 공고 원문에서 평가 기준 프로필을 추출하기 위한 프롬프트
+profile_prompt = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        "당신은 HR 전문가입니다. 채용 공고에서 후보자 평가 기준을 정확히 추출하세요."
+    ),
+    (
+        "human",
+        "채용 공고 텍스트:\n'''{job_text}'''\n\n"
+        "다음 필드로 구조화하여 반환하세요:\n"
+        "- title (직무명)\n"
+        "- must_have_skills (필수 기술, 소문자 문자열 리스트, 정규화)\n"
+        "- nice_to_have_skills (우대 기술, 소문자 문자열 리스트, 정규화)\n"
+        "- min_years (최소 경력 연차, 명시되지 않으면 null)\n"
+        "- education (학력 요건, 없으면 null)\n"
+        "- description (담당 업무와 자격 요건 중심으로 5문장 이내 요약)"
+    ),
+])
+
+MODEL_NAME = "gpt-4o-mini"
+
+def get_profile_chain():
+    """구조화된 출력(JobProfile)을 강제한 체인 (LLM 클라이언트는 첫 호출 시 생성)"""
+    return profile_prompt | get_structured_model(MODEL_NAME, JobProfile)
+
+def extract_job_profile(job_text: str) -> JobProfile:
+    """채용 공고 전체 텍스트 -> JobProfile (세션 생성 시 1회 호출)"""
+    return get_profile_chain().invoke({"job_text": job_text})
@@ -0,0 +1,69 @@
+"""
+LLM / 임베딩 클라이언트 팩토리
+- langchain_openai 등 무거운 의존성은 처음 사용할 때 import 한다 (콜드 스타트 단축).
+- 클라이언트는 (모델, 설정)별로 한 번만 만들어 프로세스 전체에서 재사용한다.
+- 벤치마크/테스트는 install()로 생성 함수를 교체할 수 있다.
+- 모든 호출은 모델별 공용 rate limiter(rate_limiter.py)를 거친다 (재시도도 limiter가 담당).
+"""
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+from rate_limiter import limit_embeddings, limit_runnable
+
+_lock = threading.Lock()
+_chat_models: Dict[Tuple[str, float], Any] = {}
+_structured: Dict[Tuple[str, float, type], Any] = {}
+_embeddings: Dict[str, Any] = {}
+
+_chat_factory: Optional[Callable[[str, float], Any]] = None
+_embeddings_factory: Optional[Callable[[str], Any]] = None
+
+
+def _default_chat(model: str, temperature: float):
+    from langchain_openai import ChatOpenAI
+    # 429/5xx/연결 오류 재시도는 rate_limiter가 담당 (SDK 재시도와 이중으로 대기하지 않도록)
+    return ChatOpenAI(model_name=model, temperature=temperature, max_retries=0)
+
+
+def _default_embeddings(model: str):
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings(model=model, max_retries=0)
+
+
+def get_chat_model(model: str, temperature: float = 0.0):
+    """공유 채팅 모델 클라이언트"""
+    key = (model, temperature)
+    with _lock:
+        if key not in _chat_models:
+            _chat_models[key] = (_chat_factory or _default_chat)(model, temperature)
+        return _chat_models[key]
+
+
+def get_structured_model(model: str, schema: type, temperature: float = 0.0):
+    """schema(Pydantic) 구조화 출력을 강제한 공유 모델 (rate limiter 경유)"""
+    key = (model, temperature, schema)
+    llm = get_chat_model(model, temperature)
+    with _lock:
+        if key not in _structured:
+            _structured[key] = limit_runnable(llm.with_structured_output(schema), model)
+        return _structured[key]
+
+
+def get_embeddings(model: str):
+    """공유 임베딩 클라이언트 (내용 해시 캐시 적용 — 캐시에 없는 텍스트만 rate limiter 경유로 요청)"""
+    with _lock:
+        if model not in _embeddings:
+            from embedding_cache import CachedEmbeddings
+            underlying = (_embeddings_factory or _default_embeddings)(model)
+            _embeddings[model] = CachedEmbeddings(limit_embeddings(underlying, model), model=model)
+        return _embeddings[model]
+
+
+def install(chat_factory: Optional[Callable] = None, embeddings_factory: Optional[Callable] = None) -> None:
+    """클라이언트 생성 함수 교체 (None이면 OpenAI 기본값) — 기존 클라이언트는 폐기"""
+    global _chat_factory, _embeddings_factory
+    with _lock:
+        _chat_factory = chat_factory
+        _embeddings_factory = embeddings_factory
+        _chat_models.clear()
+        _structured.clear()
+        _embeddings.clear()
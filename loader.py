@@ -1,34 +1,170 @@
+import io
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
 from pathlib import Path
-from typing import Dict
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
+from typing import Dict, List, Optional
+from cache_store import SQLiteCache, make_key
 
-def loader_node(state: Dict) -> Dict:
+# PDF 페이지 구분자 — compressor가 페이지별 머리글/바닥글을 찾는 데 사용
+PAGE_BREAK = "\f"
+
+# 이 페이지 수 이상인 PDF는 프로세스 풀에서 페이지 구간별로 병렬 추출
+PARALLEL_MIN_PAGES = 16
+PDF_WORKERS = max(1, min(4, (os.cpu_count() or 1)))
+
+# 파일 내용 해시 -> 페이지별 텍스트(JSON) 캐시
+text_cache = SQLiteCache("text", max_entries=50000, max_age_days=90)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """PDF 추출용 프로세스 풀 (처음 필요할 때 생성, 프로세스 내 공유)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Streamlit 등 멀티스레드 프로세스에서 fork는 안전하지 않으므로 spawn 사용
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=get_context("spawn"))
+        return _pool
+
+
+def _extract_page_range(data: bytes, start: int, end: int) -> List[str]:
+    """PDF 바이트에서 [start, end) 페이지 텍스트 추출 (워커 프로세스에서 실행)"""
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def _extract_all_pages(data: bytes) -> List[str]:
+    """PDF 바이트의 전체 페이지 텍스트 추출 (워커 프로세스에서 실행)"""
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def _pdf_pages(data: bytes) -> List[str]:
+    from pypdf import PdfReader
+
+    n_pages = len(PdfReader(io.BytesIO(data)).pages)
+    if n_pages < PARALLEL_MIN_PAGES or PDF_WORKERS == 1:
+        return _extract_page_range(data, 0, n_pages)
+
+    step = -(-n_pages // PDF_WORKERS)
+    pool = _get_pool()
+    futures = [
+        pool.submit(_extract_page_range, data, start, min(start + step, n_pages))
+        for start in range(0, n_pages, step)
+    ]
+    return [page for fut in futures for page in fut.result()]
+
+
+def _text_key(data: bytes, suffix: str) -> str:
+    return make_key(suffix.lower(), hashlib.sha256(data).hexdigest())
+
+
+def load_pages(data: bytes, suffix: str) -> List[str]:
     """
-    이력서 로더 노드
-    - 업로드된 이력서 파일(.pdf/.txt)을 읽어 텍스트를 반환한다.
-    - 다음 단계인 extractor_node가 이 텍스트를 구조화한다.
-    
-    입력:
-        state["resume_path"]: 업로드된 이력서 파일 경로
-    출력:
-        {"resume_text": str}
+    파일 바이트 -> 페이지별 텍스트 리스트
+    - 파일 내용 해시로 캐시하여 같은 파일을 다시 파싱하지 않음
+    - .pdf 외의 파일은 UTF-8 텍스트 1페이지로 취급
+    """
+    suffix = suffix.lower()
+    key = _text_key(data, suffix)
+    cached = text_cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+
+    if suffix == ".pdf":
+        pages = _pdf_pages(data)
+    else:
+        pages = [data.decode("utf-8")]
+    text_cache.set(key, json.dumps(pages, ensure_ascii=False))
+    return pages
+
+
+def load_pages_from_path(path: str) -> List[str]:
+    """파일 경로 -> 페이지별 텍스트 리스트"""
+    return load_pages(*_read_path(path))
+
+
+def _read_path(path: str):
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"이력서 파일을 찾을 수 없습니다: {p}")
+    return p.read_bytes(), p.suffix
+
+
+def load_resume_text(state: Dict) -> str:
     """
+    그래프 입력 state에서 이력서 텍스트 로드 (페이지는 PAGE_BREAK로 구분)
+    - 메모리의 파일 바이트(resume_bytes)가 있으면 디스크를 다시 읽지 않고 사용한다.
+    """
+    return PAGE_BREAK.join(load_pages(*_read(state)))
+
+
+def _read(state: Dict):
+    """state -> (파일 바이트, 확장자)"""
+    data = state.get("resume_bytes")
+    if data is not None:
+        name = state.get("resume_name") or state.get("resume_path") or ""
+        return data, Path(name).suffix
     resume_path = state.get("resume_path")
     if not resume_path:
         raise ValueError("resume_path가 제공되지 않았습니다.")
+    return _read_path(resume_path)
 
-    p = Path(resume_path)
-    if not p.exists():
-        raise FileNotFoundError(f"이력서 파일을 찾을 수 없습니다: {p}")
 
-    # 파일 확장자에 따라 로더 선택
-    if p.suffix.lower() == ".pdf":
-        loader = PyPDFLoader(str(p))
-        docs = loader.load()
-        resume_text = "\n".join([d.page_content for d in docs])
-    else:
-        loader = TextLoader(str(p), encoding="utf-8")
-        docs = loader.load()
-        resume_text = "\n".join([d.page_content for d in docs])
+def load_resume_texts(states: List[Dict]) -> List[str]:
+    """
+    여러 이력서 텍스트를 한 번에 로드 (사전 선별 등 배치용)
+    - 이미 resume_text가 있거나 텍스트 캐시에 있는 항목은 바로 사용하고,
+      캐시에 없는 PDF는 PDF 프로세스 풀에서 문서 단위로 병렬 파싱한다.
+    - 파싱 결과는 텍스트 캐시에 저장되므로 이후 loader 노드는 파일을 다시 파싱하지 않는다.
+    """
+    texts: List[Optional[str]] = [None] * len(states)
+    futures = {}
+    for i, state in enumerate(states):
+        if state.get("resume_text"):
+            texts[i] = state["resume_text"]
+            continue
+        data, suffix = _read(state)
+        if suffix.lower() != ".pdf":
+            texts[i] = PAGE_BREAK.join(load_pages(data, suffix))
+            continue
+        key = _text_key(data, suffix)
+        cached = text_cache.get(key)
+        if cached is not None:
+            texts[i] = PAGE_BREAK.join(json.loads(cached))
+        else:
+            futures[i] = (key, _get_pool().submit(_extract_all_pages, data))
+    for i, (key, fut) in futures.items():
+        pages = fut.result()
+        text_cache.set(key, json.dumps(pages, ensure_ascii=False))
+        texts[i] = PAGE_BREAK.join(pages)
+    return texts
+
 
-    return {"resume_text": resume_text}
+def loader_node(state: Dict) -> Dict:
+    """
+    이력서 로더 노드
+    - 업로드된 이력서(.pdf/.txt)를 읽어 텍스트를 반환한다.
+    - 메모리의 파일 바이트(resume_bytes)가 있으면 디스크를 다시 읽지 않고 사용한다.
+    - 이미 resume_text가 있으면(사전 선별 단계에서 로드) 다시 읽지 않는다.
+    - 다음 단계인 extractor_node가 이 텍스트를 구조화한다.
+
+    입력:
+        state["resume_bytes"] + state["resume_name"]: 업로드 파일 내용과 원래 파일명
+        또는 state["resume_path"]: 업로드된 이력서 파일 경로
+    출력:
+        {"resume_text": str}
+    """
+    if state.get("resume_text"):
+        return {}
+    return {"resume_text": load_resume_text(state)}
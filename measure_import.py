@@ -0,0 +1,75 @@
+"""
+콜드 스타트 import 시간 측정
+- 모듈마다 새 파이썬 프로세스에서 import 시간을 여러 번 재고 중앙값을 보고한다.
+- `-X importtime` 결과에서 누적 시간이 큰 하위 모듈 상위 N개를 함께 출력한다.
+
+실행:
+    python measure_import.py                       # 기본 모듈
+    python measure_import.py graph_builder --repeat 7 --top 15 --out import_report.json
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_MODULES = ["graph_builder", "session_store", "extractor", "scorer", "service"]
+
+_TIMER = "import time, importlib; t = time.perf_counter(); importlib.import_module({mod!r}); print(time.perf_counter() - t)"
+
+
+def _run(args, mod: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    # API 키 없이도 import가 가능해야 한다 (클라이언트는 첫 사용 시 생성)
+    env.pop("OPENAI_API_KEY", None)
+    return subprocess.run(
+        [sys.executable, *args, "-c", _TIMER.format(mod=mod)],
+        cwd=str(ROOT), env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def measure(mod: str, repeat: int) -> float:
+    """모듈 import 시간 중앙값(초)"""
+    return statistics.median(float(_run([], mod).stdout.strip().splitlines()[-1]) for _ in range(repeat))
+
+
+def top_imports(mod: str, top: int):
+    """-X importtime 누적 시간 기준 상위 하위 모듈 [(모듈, ms)]"""
+    rows = []
+    for line in _run(["-X", "importtime"], mod).stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cum_us, name = line[len("import time:"):].split("|")
+        if cum_us.strip().isdigit():
+            rows.append((name.strip(), int(cum_us) / 1000))
+    rows = [r for r in rows if r[0] != mod]
+    return sorted(rows, key=lambda r: r[1], reverse=True)[:top]
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="모듈별 콜드 import 시간 측정")
+    ap.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--out", help="결과 JSON 경로")
+    args = ap.parse_args(argv)
+
+    report = {}
+    for mod in args.modules:
+        seconds = measure(mod, args.repeat)
+        heavy = top_imports(mod, args.top)
+        report[mod] = {"median_seconds": round(seconds, 3), "top_imports_ms": heavy}
+        print(f"{mod:<16} {seconds * 1000:8.0f} ms")
+        for name, ms in heavy:
+            print(f"    {ms:8.0f} ms  {name}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
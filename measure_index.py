@@ -0,0 +1,153 @@
+"""
+세션 인덱스 형식별 로드 시간 / 메모리(RSS) 측정
+- 같은 크기의 합성 인덱스를 예전 형식(FAISS.save_local: index.faiss + pickle docstore)과
+  메모리 매핑 형식(vectors.npy + docstore.json)으로 만들고, 형식마다 새 파이썬 프로세스에서
+  로드 시간, 로드 후 RSS 증가량, 첫 검색 시간을 잰다 (중앙값).
+- RSS는 private(프로세스마다 따로 드는 메모리)와 file(워커 간에 공유되는 파일 페이지)로 나누어 보고한다.
+  메모리 매핑 형식은 벡터가 file 쪽에 잡히므로 워커 수만큼 메모리가 늘지 않는다.
+
+실행:
+    python measure_index.py                          # 기본 5000 조각 x 1536차원
+    python measure_index.py --chunks 20000 --repeat 5 --out index_report.json
+"""
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+FORMATS = ["faiss_pickle", "mmap"]
+
+
+class _ZeroEmbeddings:
+    """측정용 임베딩 (API 호출 없음)"""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def embed_query(self, text):
+        return [0.0] * self.dim
+
+    def embed_documents(self, texts):
+        return [[0.0] * self.dim for _ in texts]
+
+    def __call__(self, text):
+        return self.embed_query(text)
+
+
+def _rss_mb() -> dict:
+    """현재 프로세스 RSS (MB) — private(익명 메모리)과 file(공유 가능한 파일 매핑) 구분"""
+    fields = {"VmRSS:": "total", "RssAnon:": "private", "RssFile:": "file"}
+    out = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                key = line.split(maxsplit=1)[0]
+                if key in fields:
+                    out[fields[key]] = int(line.split()[1]) / 1024
+    except OSError:
+        import resource
+        out["total"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return out
+
+
+def _delta(after: dict, before: dict) -> dict:
+    return {k: after[k] - before.get(k, 0) for k in after}
+
+
+def build(root: Path, chunks: int, dim: int) -> None:
+    """두 형식의 합성 인덱스 생성"""
+    import numpy as np
+    import faiss
+    from langchain_core.documents import Document
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+    import vector_index
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((chunks, dim), dtype=np.float32)
+    docs = [Document(page_content=f"공고 문단 {i} " + "요구사항 " * 80, metadata={"chat_id": "bench"}) for i in range(chunks)]
+
+    index = faiss.IndexFlatL2(dim)
+    index.add(vectors)
+    ids = {i: str(i) for i in range(chunks)}
+    db = FAISS(_ZeroEmbeddings(dim), index, InMemoryDocstore({str(i): d for i, d in enumerate(docs)}), ids)
+    db.save_local(str(root / "faiss_pickle"))
+    vector_index.save_index(root / "mmap", vectors, docs)
+
+
+def probe(fmt: str, path: str, dim: int) -> dict:
+    """(하위 프로세스) 인덱스 1회 로드/검색 측정"""
+    if fmt == "faiss_pickle":
+        from langchain_community.vectorstores import FAISS
+    import vector_index
+
+    emb = _ZeroEmbeddings(dim)
+    before = _rss_mb()
+    t = time.perf_counter()
+    if fmt == "faiss_pickle":
+        db = FAISS.load_local(path, emb, allow_dangerous_deserialization=True)
+    else:
+        db = vector_index.MmapIndex.load(path, emb)
+    load_s = time.perf_counter() - t
+    after_load = _rss_mb()
+    t = time.perf_counter()
+    db.similarity_search("Evaluate candidate against this job", k=4)
+    search_s = time.perf_counter() - t
+    after_search = _rss_mb()
+    res = {"load_ms": load_s * 1000, "search_ms": search_s * 1000}
+    for k, v in _delta(after_load, before).items():
+        res[f"rss_{k}_after_load_mb"] = v
+    for k, v in _delta(after_search, before).items():
+        res[f"rss_{k}_after_search_mb"] = v
+    return res
+
+
+def measure(fmt: str, path: Path, dim: int, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "--probe", fmt, str(path), "--dim", str(dim)],
+            cwd=str(ROOT), capture_output=True, text=True, check=True,
+        ).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+    return {k: round(statistics.median(r[k] for r in runs), 2) for k in runs[0]}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="세션 인덱스 형식별 로드 시간/RSS 측정")
+    ap.add_argument("--chunks", type=int, default=5000)
+    ap.add_argument("--dim", type=int, default=1536)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", help="결과 JSON 경로")
+    ap.add_argument("--probe", nargs=2, metavar=("FORMAT", "PATH"), help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.probe:
+        print(json.dumps(probe(args.probe[0], args.probe[1], args.dim)))
+        return 0
+
+    report = {"chunks": args.chunks, "dim": args.dim, "formats": {}}
+    with tempfile.TemporaryDirectory(prefix="hr_index_") as tmp:
+        build(Path(tmp), args.chunks, args.dim)
+        for fmt in FORMATS:
+            res = measure(fmt, Path(tmp) / fmt, args.dim, args.repeat)
+            report["formats"][fmt] = res
+            print(
+                f"{fmt:<13} load {res['load_ms']:8.1f} ms  첫 검색 {res['search_ms']:6.1f} ms  "
+                f"검색 후 RSS +{res['rss_total_after_search_mb']:7.1f} MB "
+                f"(private +{res.get('rss_private_after_search_mb', 0):7.1f} MB, "
+                f"공유 파일 +{res.get('rss_file_after_search_mb', 0):7.1f} MB)"
+            )
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
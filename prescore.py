@@ -0,0 +1,181 @@
+from typing import Dict, List, Optional
+import numpy as np
+from schemas import ResumeExtract, ScoreBreakdown
+
+# 종합 점수 가중치 (README의 평가 로직과 동일: 스킬 40%, 경력 30%, 학력 30%)
+W_SKILL, W_EXPERIENCE, W_EDUCATION = 0.4, 0.3, 0.3
+# 스킬 점수 내 must-have / nice-to-have 비중
+W_MUST, W_NICE = 0.8, 0.2
+# 학력 요건을 수치로 비교할 수 없으므로 기재 여부만 반영
+EDU_PRESENT, EDU_MISSING = 80, 40
+# threshold ± margin 안의 후보만 LLM 평가로 보냄
+DEFAULT_MARGIN = 15
+# 자동 PASS는 최소 경력보다 이만큼(년) 이상 많은 후보만 (최소 경력을 겨우 채운 후보는 LLM 평가)
+YEARS_MARGIN = 1.0
+
+ROUTE_PASS, ROUTE_REJECT, ROUTE_LLM = "PASS", "REJECT", "LLM"
+
+
+def _norm_skills(skills: Optional[List[str]]) -> List[str]:
+    return [s.strip().lower() for s in (skills or []) if s and s.strip()]
+
+
+def prescore_batch(
+    extracts: List[ResumeExtract],
+    must_have_skills: List[str],
+    nice_to_have_skills: List[str],
+    min_years: float,
+) -> "pd.DataFrame":
+    """결정적(비 LLM) 사전 점수 표 — 후보별 행 (score_arrays 참고)"""
+    import pandas as pd
+
+    return pd.DataFrame(score_arrays(extracts, must_have_skills, nice_to_have_skills, min_years))
+
+
+def score_arrays(
+    extracts: List[ResumeExtract],
+    must_have_skills: List[str],
+    nice_to_have_skills: List[str],
+    min_years: float,
+) -> Dict[str, np.ndarray]:
+    """
+    결정적(비 LLM) 사전 점수 계산 — 후보 전체를 한 번에 numpy 벡터 연산 (DataFrame 생성 없음)
+    - skill_match: must-have/nice-to-have 보유 비율
+    - experience_match: years_experience / min_years (0~100 클리핑)
+      최소 경력 요건이 없으면 100으로 표시하되 종합 점수에는 넣지 않는다 (스킬/학력 비중으로 재정규화)
+    - education_match: 학력 기재 여부
+    출력: {must_hits, must_total, years, skill_match, experience_match, education_match, total} 열 배열
+    """
+    must = _norm_skills(must_have_skills)
+    nice = _norm_skills(nice_to_have_skills)
+    vocab = must + nice
+    n = len(extracts)
+
+    # 후보 x 스킬 보유 행렬
+    presence = np.zeros((n, len(vocab)), dtype=bool)
+    for i, ex in enumerate(extracts):
+        owned = set(_norm_skills(ex.skills))
+        presence[i] = [s in owned for s in vocab]
+
+    must_hits = presence[:, : len(must)].sum(axis=1)
+    nice_hits = presence[:, len(must):].sum(axis=1)
+    must_ratio = must_hits / len(must) if must else np.ones(n)
+    nice_ratio = nice_hits / len(nice) if nice else np.ones(n)
+    skill = 100 * (W_MUST * must_ratio + W_NICE * nice_ratio)
+
+    years = np.array(
+        [ex.years_experience if ex.years_experience is not None else 0.0 for ex in extracts],
+        dtype=float,
+    )
+    education = np.array([EDU_PRESENT if ex.education else EDU_MISSING for ex in extracts], dtype=float)
+    if min_years and min_years > 0:
+        experience = np.clip(years / min_years * 100, 0, 100)
+        total = W_SKILL * skill + W_EXPERIENCE * experience + W_EDUCATION * education
+    else:
+        experience = np.full(n, 100.0)
+        total = (W_SKILL * skill + W_EDUCATION * education) / (W_SKILL + W_EDUCATION)
+
+    return {
+        "must_hits": must_hits.astype(int),
+        "must_total": np.full(n, len(must), dtype=int),
+        "years": years,
+        "skill_match": np.rint(skill).astype(int),
+        "experience_match": np.rint(experience).astype(int),
+        "education_match": np.rint(education).astype(int),
+        "total": np.rint(total).astype(int),
+    }
+
+
+def route_batch(
+    scores,
+    threshold: int,
+    margin: float = DEFAULT_MARGIN,
+    min_years: float = 0.0,
+    years_margin: float = YEARS_MARGIN,
+) -> np.ndarray:
+    """
+    사전 점수로 확정 가능한 후보는 PASS/REJECT, 경계 후보는 LLM으로 분류
+    - scores: prescore_batch의 DataFrame 또는 score_arrays의 열 배열 dict
+    - must-have를 하나도 갖추지 못하면 REJECT
+    - total >= threshold + margin 이고 must-have를 모두 갖추고
+      (최소 경력 요건이 있으면) 경력이 min_years + years_margin 이상이면 PASS
+    - total <= threshold - margin 이면 REJECT
+    - 나머지는 LLM
+    """
+    total = np.asarray(scores["total"])
+    must_hits = np.asarray(scores["must_hits"])
+    must_total = np.asarray(scores["must_total"])
+    years = np.asarray(scores["years"])
+
+    no_must = (must_total > 0) & (must_hits == 0)
+    all_must = must_hits >= must_total
+    if min_years and min_years > 0:
+        strong_years = years >= min_years + years_margin
+    else:
+        strong_years = np.ones(len(total), dtype=bool)
+    clear_pass = (total >= threshold + margin) & all_must & strong_years
+    clear_reject = no_must | (total <= threshold - margin)
+
+    return np.select([clear_reject, clear_pass], [ROUTE_REJECT, ROUTE_PASS], default=ROUTE_LLM)
+
+
+def _reasons(row: Dict, min_years: float) -> List[str]:
+    reasons = [f"Must-have 스킬 {int(row['must_hits'])}/{int(row['must_total'])}개 보유"]
+    reasons.append(f"경력 {row['years']:g}년 (최소 {min_years:g}년)")
+    reasons.append(f"사전 점수 {int(row['total'])}점으로 경계 구간 밖이어서 규칙 기반으로 판단")
+    return reasons
+
+
+def prescore_node(state: Dict) -> Dict:
+    """
+    사전 점수 노드
+    - extracted와 채용 요구사항으로 결정적 점수를 계산한다.
+    - 결과가 명확하면 decision/score를 직접 채우고, 경계 후보만 scorer로 보낸다.
+    입력:
+      - extracted, must_have_skills, nice_to_have_skills, min_years, threshold, prescore_margin
+    출력:
+      - {'prescore': {..., 'route'}} (+ 확정 시 decision, reasons, improvements, score)
+    """
+    extracted: ResumeExtract = state["extracted"]
+    threshold = state.get("threshold", 70)
+    margin = state.get("prescore_margin", DEFAULT_MARGIN)
+    min_years = state.get("min_years") or 0.0
+
+    # 이력서 1건 — DataFrame 없이 열 배열로 계산
+    scores = score_arrays(
+        [extracted], state.get("must_have_skills", []), state.get("nice_to_have_skills", []), min_years,
+    )
+    route = str(route_batch(scores, threshold, margin, min_years)[0])
+    row = {k: v[0] for k, v in scores.items()}
+    prescore = {
+        "route": route,
+        "total": int(row["total"]),
+        "must_hits": int(row["must_hits"]),
+        "must_total": int(row["must_total"]),
+    }
+    if route == ROUTE_LLM:
+        return {"prescore": prescore}
+
+    breakdown = ScoreBreakdown(
+        skill_match=int(row["skill_match"]),
+        experience_match=int(row["experience_match"]),
+        education_match=int(row["education_match"]),
+        total=int(row["total"]),
+    )
+    improvements = []
+    if row["must_hits"] < row["must_total"]:
+        owned = set(_norm_skills(extracted.skills))
+        missing = [s for s in _norm_skills(state.get("must_have_skills")) if s not in owned]
+        improvements.append(f"필수 스킬 보완 필요: {', '.join(missing)}")
+    return {
+        "prescore": prescore,
+        "decision": route,
+        "reasons": _reasons(row, min_years),
+        "improvements": improvements,
+        "score": breakdown.model_dump(),
+    }
+
+
+def route_after_prescore(state: Dict) -> str:
+    """조건부 엣지: 경계 후보만 scorer 노드로"""
+    return "scorer" if state.get("prescore", {}).get("route") == ROUTE_LLM else "done"
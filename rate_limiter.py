@@ -0,0 +1,359 @@
+"""
+OpenAI 호출 공용 클라이언트 측 속도 제한
+- 모델별로 분당 요청 수(RPM)와 분당 토큰 수(TPM) 토큰 버킷을 두고, 프롬프트 길이로 토큰을 추정해 차감한다.
+- 429(rate limit)를 받으면 동시 실행 한도를 절반으로 줄이고 잠시 전체 호출을 멈춘 뒤 재시도하며,
+  성공이 이어지면 한도를 1씩 다시 올린다 (AIMD).
+- 일시적 오류(5xx, 연결 실패, 타임아웃)는 한도를 줄이지 않고 같은 백오프로 해당 호출만 재시도한다
+  (SDK 자체 재시도는 끄고 이 계층에서 일괄 처리).
+- llm_factory가 만드는 모든 채팅/임베딩 클라이언트가 이 계층을 거친다.
+- 한도는 configure() 또는 환경 변수 HR_AGENT_RPM / HR_AGENT_TPM (채팅 모델)로 조정한다.
+"""
+import os
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# 모델별 기본 한도 (RPM, TPM) — 계정 등급에 맞게 configure()로 조정
+DEFAULT_LIMITS: Dict[str, Tuple[Optional[float], Optional[float]]] = {
+    "gpt-4o-mini": (500, 200_000),
+    "text-embedding-3-small": (3_000, 1_000_000),
+}
+FALLBACK_LIMITS = (500, 200_000)
+
+# 동시 실행 한도 (적응형 — 429 시 절반, 성공 누적 시 +1)
+DEFAULT_MAX_CONCURRENCY = 32
+MAX_RETRIES = 6
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+
+# 임베딩 요청 1건당 텍스트 수 (클라이언트에 chunk_size가 없을 때)
+EMBED_BATCH_SIZE = 1000
+
+# 토큰 추정: 글자 수 / 4 + 응답 토큰 예상치
+CHARS_PER_TOKEN = 4
+COMPLETION_TOKENS = 400
+
+
+def estimate_tokens(payload: Any, completion_tokens: int = 0) -> int:
+    """프롬프트(문자열/PromptValue/메시지 리스트/텍스트 리스트) 크기로 토큰 수 추정"""
+    if hasattr(payload, "to_string"):
+        payload = payload.to_string()
+    if isinstance(payload, (list, tuple)):
+        n = sum(len(getattr(p, "content", p) if not isinstance(p, str) else p) for p in payload)
+    else:
+        n = len(str(payload))
+    return n // CHARS_PER_TOKEN + 1 + completion_tokens
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """openai.RateLimitError 또는 HTTP 429"""
+    if type(exc).__name__ == "RateLimitError":
+        return True
+    return getattr(exc, "status_code", None) == 429 or getattr(getattr(exc, "response", None), "status_code", None) == 429
+
+
+# 재시도할 일시적 오류 (openai SDK 예외 클래스 이름 — 하위 클래스 포함)
+TRANSIENT_ERRORS = {"APIConnectionError", "APITimeoutError", "InternalServerError"}
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """연결 실패/타임아웃/5xx 등 재시도하면 성공할 수 있는 오류"""
+    if any(c.__name__ in TRANSIENT_ERRORS for c in type(exc).__mro__):
+        return True
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class _Bucket:
+    """토큰 버킷 (capacity=분당 한도, 초당 capacity/60 충전). capacity가 None이면 무제한"""
+
+    def __init__(self, per_minute: Optional[float]):
+        self.capacity = per_minute
+        self.level = per_minute or 0.0
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        if self.capacity is None:
+            return
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """amount를 꺼내려면 기다려야 하는 시간(초) — 0이면 즉시 가능"""
+        if self.capacity is None:
+            return 0.0
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) * 60 / self.capacity)
+
+    def take(self, amount: float) -> None:
+        if self.capacity is not None:
+            self.level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    모델 1개의 RPM/TPM 토큰 버킷 + 적응형 동시 실행 한도
+    - call()/acall(): 한도를 확보한 뒤 함수를 실행하고, 429/일시적 오류면 백오프 후 재시도
+    - stats(): 현재 한도, 실행/대기 중인 호출 수, 최근 1분 처리량
+    """
+
+    def __init__(
+        self,
+        rpm: Optional[float],
+        tpm: Optional[float],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        min_concurrency: int = 1,
+    ):
+        self.requests = _Bucket(rpm)
+        self.tokens = _Bucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = max_concurrency
+        self.in_flight = 0
+        self.waiting = 0
+        self.paused_until = 0.0
+        self._successes = 0
+        self._window: deque = deque()  # (완료 시각, 추정 토큰)
+        self._counters = {"calls": 0, "rate_limited": 0, "transient": 0, "retries": 0, "errors": 0}
+        self._cond = threading.Condition()
+
+    # ---- 한도 확보/반납 ----
+    def _try_acquire(self, tokens: int) -> float:
+        """한도를 확보하면 0, 아니면 다시 시도하기까지 기다릴 시간(초) — self._cond 보유 상태에서 호출"""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= self.concurrency:
+            return 0.05
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        wait = max(self.requests.wait_for(1), self.tokens.wait_for(tokens))
+        if wait > 0:
+            return wait
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        self.in_flight += 1
+        return 0.0
+
+    def acquire(self, tokens: int) -> None:
+        with self._cond:
+            self.waiting += 1
+            try:
+                while True:
+                    wait = self._try_acquire(tokens)
+                    if wait == 0:
+                        return
+                    self._cond.wait(timeout=wait)
+            finally:
+                self.waiting -= 1
+
+    async def aacquire(self, tokens: int) -> None:
+        with self._cond:
+            self.waiting += 1
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_acquire(tokens)
+                if wait == 0:
+                    return
+                await asyncio.sleep(min(wait, 1.0))
+        finally:
+            with self._cond:
+                self.waiting -= 1
+
+    def release(self, tokens: int, ok: bool) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if ok:
+                now = time.monotonic()
+                self._window.append((now, tokens))
+                self._counters["calls"] += 1
+                # 한도만큼 연속 성공하면 동시 실행 한도 +1
+                self._successes += 1
+                if self._successes >= self.concurrency and self.concurrency < self.max_concurrency:
+                    self.concurrency += 1
+                    self._successes = 0
+            self._cond.notify_all()
+
+    def _on_rate_limited(self, exc: BaseException, attempt: int) -> float:
+        """429 처리: 동시 실행 한도 절반, 전체 일시 정지 — 대기 시간(초) 반환"""
+        backoff = _retry_after(exc) or min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt)
+        backoff *= 1 + random.random() * 0.25
+        with self._cond:
+            self._counters["rate_limited"] += 1
+            # 같은 폭주로 동시에 들어온 429는 한 번만 반영
+            if time.monotonic() >= self.paused_until:
+                self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+            self._successes = 0
+            self.paused_until = max(self.paused_until, time.monotonic() + backoff)
+            self._cond.notify_all()
+        return backoff
+
+    def _on_error(self, exc: BaseException, attempt: int) -> float:
+        """재시도 가능한 오류 처리 — 대기 시간(초) 반환. 429만 동시 실행 한도/전체 정지에 반영"""
+        if is_rate_limit_error(exc):
+            return self._on_rate_limited(exc, attempt)
+        self._count("transient")
+        backoff = min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt)
+        return backoff * (1 + random.random() * 0.25)
+
+    # ---- 호출 ----
+    def call(self, fn: Callable, *args, tokens: int = 1, **kwargs):
+        for attempt in range(MAX_RETRIES + 1):
+            self.acquire(tokens)
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            except Exception as e:
+                if not (is_rate_limit_error(e) or is_transient_error(e)) or attempt == MAX_RETRIES:
+                    self._count("errors")
+                    raise
+                backoff = self._on_error(e, attempt)
+            finally:
+                self.release(tokens, ok)
+            self._count("retries")
+            time.sleep(backoff)
+
+    async def acall(self, fn: Callable, *args, tokens: int = 1, **kwargs):
+        for attempt in range(MAX_RETRIES + 1):
+            await self.aacquire(tokens)
+            ok = False
+            try:
+                result = await fn(*args, **kwargs)
+                ok = True
+                return result
+            except Exception as e:
+                if not (is_rate_limit_error(e) or is_transient_error(e)) or attempt == MAX_RETRIES:
+                    self._count("errors")
+                    raise
+                backoff = self._on_error(e, attempt)
+            finally:
+                self.release(tokens, ok)
+            self._count("retries")
+            await asyncio.sleep(backoff)
+
+    def _count(self, key: str) -> None:
+        with self._cond:
+            self._counters[key] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            now = time.monotonic()
+            while self._window and now - self._window[0][0] > 60:
+                self._window.popleft()
+            return {
+                "rpm_limit": self.requests.capacity,
+                "tpm_limit": self.tokens.capacity,
+                "concurrency_limit": self.concurrency,
+                "in_flight": self.in_flight,
+                "queue_depth": self.waiting,
+                "requests_last_min": len(self._window),
+                "tokens_last_min": sum(t for _, t in self._window),
+                "paused_for_s": round(max(0.0, self.paused_until - now), 2),
+                **self._counters,
+            }
+
+
+# ------------------- 클라이언트 래퍼 -------------------
+def limit_runnable(runnable, model: str):
+    """채팅 모델(구조화 출력 포함) Runnable을 limiter 경유로 감싼다 (동기/비동기 모두)"""
+    from langchain_core.runnables import RunnableLambda
+
+    def _invoke(x, config):
+        return get_limiter(model).call(runnable.invoke, x, config, tokens=estimate_tokens(x, COMPLETION_TOKENS))
+
+    async def _ainvoke(x, config):
+        return await get_limiter(model).acall(runnable.ainvoke, x, config, tokens=estimate_tokens(x, COMPLETION_TOKENS))
+
+    return RunnableLambda(_invoke, afunc=_ainvoke, name=f"rate_limited[{model}]")
+
+
+def limit_embeddings(underlying, model: str):
+    """
+    임베딩 클라이언트를 limiter 경유로 감싼다
+    - embed_documents는 클라이언트의 요청 단위(chunk_size, OpenAI 기본 1000건)로 나누어
+      요청마다 한도를 확보한다 (대량 호출 1번이 요청 1건으로 계산되지 않도록).
+    """
+    from langchain_core.embeddings import Embeddings
+
+    batch = getattr(underlying, "chunk_size", None) or EMBED_BATCH_SIZE
+
+    class RateLimitedEmbeddings(Embeddings):
+        def embed_documents(self, texts):
+            limiter = get_limiter(model)
+            vectors = []
+            for i in range(0, len(texts), batch):
+                chunk = texts[i:i + batch]
+                vectors.extend(limiter.call(underlying.embed_documents, chunk, tokens=estimate_tokens(chunk)))
+            return vectors
+
+        def embed_query(self, text):
+            return get_limiter(model).call(underlying.embed_query, text, tokens=estimate_tokens(text))
+
+    return RateLimitedEmbeddings()
+
+
+# ------------------- 모델별 공용 limiter -------------------
+_lock = threading.Lock()
+_limiters: Dict[str, RateLimiter] = {}
+_overrides: Dict[str, Dict[str, Any]] = {}
+
+
+def _env_limits() -> Dict[str, Any]:
+    env = {}
+    for key, name in (("rpm", "HR_AGENT_RPM"), ("tpm", "HR_AGENT_TPM")):
+        if os.getenv(name):
+            env[key] = float(os.environ[name])
+    return env
+
+
+def get_limiter(model: str) -> RateLimiter:
+    """모델 이름별 공용 limiter (프로세스 내 모든 호출이 공유)"""
+    with _lock:
+        if model not in _limiters:
+            rpm, tpm = DEFAULT_LIMITS.get(model, FALLBACK_LIMITS)
+            opts = {"rpm": rpm, "tpm": tpm, "max_concurrency": DEFAULT_MAX_CONCURRENCY}
+            if not model.startswith("text-embedding"):
+                opts.update(_env_limits())
+            opts.update(_overrides.get("*", {}))
+            opts.update(_overrides.get(model, {}))
+            _limiters[model] = RateLimiter(opts["rpm"], opts["tpm"], opts["max_concurrency"])
+        return _limiters[model]
+
+
+def configure(
+    model: str = "*",
+    rpm: Optional[float] = None,
+    tpm: Optional[float] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> None:
+    """
+    한도 설정 (model="*"이면 모든 모델) — rpm/tpm이 None이면 해당 버킷 무제한
+    이미 만들어진 limiter는 폐기되고 다음 호출 때 새 설정으로 생성된다.
+    """
+    with _lock:
+        _overrides[model] = {"rpm": rpm, "tpm": tpm, "max_concurrency": max_concurrency}
+        if model == "*":
+            _limiters.clear()
+        else:
+            _limiters.pop(model, None)
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """모델별 limiter 상태"""
+    with _lock:
+        limiters = dict(_limiters)
+    return {model: lim.stats() for model, lim in limiters.items()}
@@ -0,0 +1,175 @@
+import csv
+import io
+import json
+import time
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from cache_store import DB_ROOT
+
+RESULTS_DB = DB_ROOT / "results.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS screenings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id TEXT NOT NULL,
+    file TEXT NOT NULL,
+    decision TEXT NOT NULL,
+    total INTEGER,
+    score TEXT,
+    reasons TEXT,
+    improvements TEXT,
+    created_at REAL NOT NULL,
+    batch_id TEXT,
+    batch_idx INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_screenings_chat ON screenings(chat_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_screenings_decision ON screenings(chat_id, decision, created_at);
+CREATE INDEX IF NOT EXISTS idx_screenings_total ON screenings(chat_id, total DESC);
+"""
+
+CSV_COLUMNS = ["id", "file", "decision", "total", "reasons", "improvements", "score", "created_at"]
+
+_initialized = False
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    global _initialized
+    DB_ROOT.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(RESULTS_DB), timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        if not _initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            # batch 컬럼 도입 이전 DB
+            cols = {r["name"] for r in conn.execute("PRAGMA table_info(screenings)")}
+            for col, typ in (("batch_id", "TEXT"), ("batch_idx", "INTEGER")):
+                if col not in cols:
+                    conn.execute(f"ALTER TABLE screenings ADD COLUMN {col} {typ}")
+            # 체크포인트 배치 항목당 1행 (배치 밖 저장은 NULL이라 제약 없음)
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_screenings_batch_item ON screenings(batch_id, batch_idx)"
+            )
+            _initialized = True
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _row(r: sqlite3.Row) -> Dict[str, Any]:
+    d = dict(r)
+    for k in ("score", "reasons", "improvements"):
+        d[k] = json.loads(d[k]) if d.get(k) else None
+    return d
+
+
+def save_result(
+    chat_id: str,
+    file: str,
+    state: Dict[str, Any],
+    batch_id: Optional[str] = None,
+    batch_idx: Optional[int] = None,
+) -> int:
+    """
+    스크리닝 결과 1건 저장 (평가 완료 즉시 호출)
+    - state: 그래프 결과 (decision, score, reasons, improvements) 또는 오류 시 {"decision": "ERROR", ...}
+    - batch_id/batch_idx: 체크포인트 배치 항목이면 지정 — 재개 후 같은 항목을 다시 저장하면 기존 행을 갱신한다
+    """
+    score = state.get("score") if isinstance(state.get("score"), dict) else None
+    with _connect() as conn:
+        cur = conn.execute(
+            "INSERT INTO screenings"
+            "(chat_id, file, decision, total, score, reasons, improvements, created_at, batch_id, batch_idx)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(batch_id, batch_idx) DO UPDATE SET"
+            " file = excluded.file, decision = excluded.decision, total = excluded.total, score = excluded.score,"
+            " reasons = excluded.reasons, improvements = excluded.improvements, created_at = excluded.created_at",
+            (
+                chat_id,
+                file,
+                state.get("decision", "") or "",
+                (score or {}).get("total"),
+                json.dumps(score, ensure_ascii=False) if score else None,
+                json.dumps(state.get("reasons") or [], ensure_ascii=False),
+                json.dumps(state.get("improvements") or [], ensure_ascii=False),
+                time.time(),
+                batch_id,
+                batch_idx,
+            ),
+        )
+        return cur.lastrowid
+
+
+def _where(chat_id: str, decision: Optional[str]):
+    sql, params = "chat_id = ?", [chat_id]
+    if decision:
+        sql += " AND decision = ?"
+        params.append(decision)
+    return sql, params
+
+
+def count_results(chat_id: str, decision: Optional[str] = None) -> int:
+    where, params = _where(chat_id, decision)
+    with _connect() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM screenings WHERE {where}", params).fetchone()[0]
+
+
+def decision_counts(chat_id: str) -> Dict[str, int]:
+    """판정별 건수"""
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT decision, COUNT(*) AS n FROM screenings WHERE chat_id = ? GROUP BY decision", (chat_id,)
+        ).fetchall()
+    return {r["decision"]: r["n"] for r in rows}
+
+
+def query_results(
+    chat_id: str,
+    page: int = 1,
+    page_size: int = 50,
+    decision: Optional[str] = None,
+    order_by: str = "recent",
+) -> List[Dict[str, Any]]:
+    """
+    페이지 단위 결과 조회
+    - order_by: "recent"(최신순) 또는 "total"(점수 높은 순)
+    """
+    where, params = _where(chat_id, decision)
+    order = "total DESC, id DESC" if order_by == "total" else "created_at DESC, id DESC"
+    params += [page_size, max(page - 1, 0) * page_size]
+    with _connect() as conn:
+        rows = conn.execute(
+            f"SELECT * FROM screenings WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?", params
+        ).fetchall()
+    return [_row(r) for r in rows]
+
+
+def top_n(chat_id: str, n: int = 10, decision: Optional[str] = None) -> List[Dict[str, Any]]:
+    """종합 점수 상위 N명"""
+    return query_results(chat_id, page=1, page_size=n, decision=decision, order_by="total")
+
+
+def iter_csv(chat_id: str, decision: Optional[str] = None, chunk_rows: int = 1000) -> Iterator[str]:
+    """CSV를 chunk_rows 행씩 문자열로 생성 (전체 결과를 메모리에 올리지 않음)"""
+    where, params = _where(chat_id, decision)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_COLUMNS)
+    with _connect() as conn:
+        cur = conn.execute(
+            f"SELECT {', '.join(CSV_COLUMNS)} FROM screenings WHERE {where} ORDER BY id", params
+        )
+        while True:
+            rows = cur.fetchmany(chunk_rows)
+            if not rows:
+                break
+            writer.writerows(tuple(r) for r in rows)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.getvalue():
+        yield buf.getvalue()
+
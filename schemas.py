@@ -24,6 +24,22 @@ class ResumeExtract(BaseModel):
         default_factory=list, description="핵심 프로젝트 간단 리스트"
     )
 
+class JobProfile(BaseModel):
+    """
+    채용 공고에서 세션 생성 시 1회 추출하는 요구사항 프로필
+    - 이력서마다 공고 원문을 검색하는 대신 이 프로필을 평가 기준으로 사용
+    """
+    title: Optional[str] = Field(None, description="직무명")
+    must_have_skills: List[str] = Field(
+        default_factory=list, description="필수 기술 스택(소문자 리스트)"
+    )
+    nice_to_have_skills: List[str] = Field(
+        default_factory=list, description="우대 기술 스택(소문자 리스트)"
+    )
+    min_years: Optional[float] = Field(None, description="최소 경력 연차")
+    education: Optional[str] = Field(None, description="학력 요건")
+    description: str = Field(description="평가에 필요한 핵심만 남긴 공고 요약")
+
 class ScoreBreakdown(BaseModel):
     """
     평가 점수 상세
@@ -47,3 +63,11 @@ class HRDecision(BaseModel):
     reasons: List[str] = Field(description="판단 근거(간결하게)")
     improvements: List[str] = Field(description="개선 제안")
     score: ScoreBreakdown
+
+class ResumeAssessment(BaseModel):
+    """
+    단일 호출(fused) 모드 결과
+    - 이력서 추출(ResumeExtract)과 최종 판단(HRDecision)을 한 번의 구조화 출력으로 받음
+    """
+    extracted: ResumeExtract
+    assessment: HRDecision
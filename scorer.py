@@ -1,7 +1,9 @@
+import json
 from typing import Dict
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
+from llm_factory import get_structured_model
 from schemas import ResumeExtract, HRDecision
+from cache_store import SQLiteCache, make_key
 
 # 평가 시스템 지침
 # - must-have 스킬 충족 + total 점수(0~100)가 threshold 이상이면 PASS
@@ -18,6 +20,7 @@ scorer_prompt = ChatPromptTemplate.from_messages([
         "human",
         "채용 공고:\n```\n{job_description}\n```\n\n"
         "최소 경력 연차: {min_years}\n"
+        "학력 요건: {required_education}\n"
         "Must-have 스킬: {must_have_skills}\n"
         "Nice-to-have 스킬: {nice_to_have_skills}\n"
         "PASS 임계값(종합 점수): {threshold}\n\n"
@@ -26,32 +29,64 @@ scorer_prompt = ChatPromptTemplate.from_messages([
     ),
 ])
 
-_llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=0)
+MODEL_NAME = "gpt-4o-mini"
+# 프롬프트/스키마 변경 시 올려서 기존 평가 캐시를 무효화
+PROMPT_VERSION = "v2"
 
-# HRDecision 스키마에 맞춘 구조화 출력
-scorer_chain = scorer_prompt | _llm.with_structured_output(HRDecision)
+def get_scorer_chain():
+    """HRDecision 스키마에 맞춘 구조화 출력 체인 (LLM 클라이언트는 첫 호출 시 생성)"""
+    return scorer_prompt | get_structured_model(MODEL_NAME, HRDecision)
+
+# 평가 결과 캐시 — 판단에 영향을 주는 입력이 모두 같으면 LLM을 다시 호출하지 않음
+scorer_cache = SQLiteCache("scorer", max_entries=20000, max_age_days=30)
+
+def _cache_key(inputs: Dict) -> str:
+    """scorer 체인 입력 전체를 안정적으로 직렬화하여 해시"""
+    return make_key(MODEL_NAME, PROMPT_VERSION, json.dumps(inputs, sort_keys=True, ensure_ascii=False))
 
 def scorer_node(state: Dict) -> Dict:
     """
     스코어링 노드
     입력 state:
       - extracted: ResumeExtract
-      - job_description, min_years, must_have_skills, nice_to_have_skills, threshold
+      - job_description, min_years, required_education, must_have_skills, nice_to_have_skills, threshold
+      - bypass_cache(선택): True면 캐시를 무시하고 다시 평가
     출력:
       - decision, reasons, improvements, score(dict; total 포함)
     """
+    inputs, key, result = _lookup(state)
+    if result is None:
+        result = get_scorer_chain().invoke(inputs)
+        scorer_cache.set(key, result.model_dump_json())
+    return _output(result)
+
+async def ascorer_node(state: Dict) -> Dict:
+    """scorer_node의 비동기 버전 (ainvoke 실행 시 LLM 호출을 이벤트 루프에서 대기)"""
+    inputs, key, result = _lookup(state)
+    if result is None:
+        result = await get_scorer_chain().ainvoke(inputs)
+        scorer_cache.set(key, result.model_dump_json())
+    return _output(result)
+
+def _lookup(state: Dict):
+    """(체인 입력, 캐시 키, 캐시된 HRDecision 또는 None) — bypass_cache면 캐시 무시"""
     extracted: ResumeExtract = state["extracted"]
     threshold: int = state.get("threshold", 70)
 
-    result: HRDecision = scorer_chain.invoke({
+    inputs = {
         "job_description": state["job_description"],
         "min_years": state["min_years"],
+        "required_education": state.get("required_education") or "명시되지 않음",
         "must_have_skills": state["must_have_skills"],
         "nice_to_have_skills": state["nice_to_have_skills"],
         "threshold": threshold,
         "extracted_json": extracted.model_dump_json(indent=2),
-    })
+    }
+    key = _cache_key(inputs)
+    cached = None if state.get("bypass_cache") else scorer_cache.get(key)
+    return inputs, key, (HRDecision.model_validate_json(cached) if cached is not None else None)
 
+def _output(result: HRDecision) -> Dict:
     return {
         "decision": result.decision,
         "reasons": result.reasons,
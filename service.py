@@ -0,0 +1,352 @@
+"""
+헤드리스 스크리닝 서비스 (Streamlit 없이 ATS 연동용)
+- serve: 비동기 HTTP API (FastAPI) — 제출 즉시 job_id를 반환하고 로컬 작업 큐에서 평가
+- batch: CLI 일괄 평가 — 결과를 JSONL로 출력
+
+실행:
+    python service.py serve --host 0.0.0.0 --port 8000 --workers 16
+    python service.py batch --chat-id hr_chat_001 --job posting.pdf resumes/*.pdf --out results.jsonl
+    python service.py match resume.pdf --chat-ids backend data_eng ml
+    python service.py gc-sessions --max-age-days 30
+"""
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import base64
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+
+from graph_builder import build_graph, build_multi_position_graph
+from batch_runner import iter_batch, DEFAULT_MAX_CONCURRENCY
+from schemas import HRDecision
+from results_store import save_result
+from session_store import create_or_reset_session, end_session, retrieve_job_context, gc_sessions, SESSION_TTL_DAYS
+from shortlist import shortlist
+from dedup import duplicate_report
+from rate_limiter import limiter_stats
+
+load_dotenv()
+
+# 완료된 작업 결과를 메모리에 보관하는 최대 건수 (오래된 것부터 삭제)
+MAX_JOBS_KEPT = 100000
+
+
+def to_decision(state: Dict[str, Any]) -> Dict[str, Any]:
+    """그래프 결과 state -> HRDecision 형태 dict"""
+    return HRDecision(
+        decision=state.get("decision", ""),
+        reasons=state.get("reasons") or [],
+        improvements=state.get("improvements") or [],
+        score=state.get("score") or {
+            "skill_match": 0, "experience_match": 0, "education_match": 0, "total": 0,
+        },
+    ).model_dump()
+
+
+class ScreeningQueue:
+    """
+    로컬 비동기 작업 큐
+    - submit()은 즉시 job_id를 반환하고, 워커 태스크들이 compiled.ainvoke로 평가한다.
+    - 그래프와 LLM/임베딩 클라이언트는 프로세스 수명 동안 재사용된다.
+    """
+
+    def __init__(self, compiled, workers: int = DEFAULT_MAX_CONCURRENCY):
+        self.compiled = compiled
+        self.workers = workers
+        self.queue: "asyncio.Queue" = asyncio.Queue()
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def submit(self, inputs: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        self.jobs[job_id] = {
+            "job_id": job_id,
+            "chat_id": inputs.get("chat_id"),
+            "resume": inputs.get("resume_name"),
+            "status": "queued",
+            "submitted_at": time.time(),
+        }
+        while len(self.jobs) > MAX_JOBS_KEPT:
+            self.jobs.popitem(last=False)
+        self.queue.put_nowait((job_id, inputs))
+        return job_id
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, inputs = await self.queue.get()
+            job = self.jobs.get(job_id, {})
+            job["status"] = "running"
+            try:
+                state = await self.compiled.ainvoke(inputs)
+                job.update(status="done", result=to_decision(state))
+                await asyncio.to_thread(save_result, inputs["chat_id"], inputs.get("resume_name", ""), state)
+            except Exception as e:
+                job.update(status="error", error=str(e))
+                await asyncio.to_thread(
+                    save_result, inputs["chat_id"], inputs.get("resume_name", ""),
+                    {"decision": "ERROR", "reasons": [str(e)]},
+                )
+            finally:
+                job["finished_at"] = time.time()
+                self.queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {
+            "queue_depth": self.queue.qsize(),
+            "workers": self.workers,
+            "jobs": counts,
+            "rate_limits": limiter_stats(),
+        }
+
+
+# ------------------- HTTP API -------------------
+def create_app(workers: int = DEFAULT_MAX_CONCURRENCY):
+    from contextlib import asynccontextmanager
+    from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
+
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.jobs = ScreeningQueue(build_graph(), workers=workers)
+        app.state.multi = build_multi_position_graph()
+        app.state.jobs.start()
+        yield
+        await app.state.jobs.stop()
+
+    app = FastAPI(title="HR AI Screening Service", lifespan=lifespan)
+
+    @app.post("/sessions/{chat_id}")
+    async def create_session(chat_id: str, job_file: UploadFile = File(...)):
+        """채용 공고 업로드 -> 세션 생성/갱신"""
+        data = await job_file.read()
+        info = await asyncio.to_thread(
+            create_or_reset_session, chat_id=chat_id, job_bytes=data, job_name=job_file.filename,
+        )
+        return info
+
+    @app.get("/sessions/{chat_id}/context")
+    async def session_context(chat_id: str):
+        return {"chat_id": chat_id, "job_description": await asyncio.to_thread(retrieve_job_context, chat_id)}
+
+    @app.delete("/sessions/{chat_id}")
+    async def delete_session(chat_id: str):
+        await asyncio.to_thread(end_session, chat_id)
+        return {"chat_id": chat_id, "deleted": True}
+
+    @app.post("/sessions/{chat_id}/screenings")
+    async def submit_files(
+        chat_id: str, request: Request, files: List[UploadFile] = File(...), dedup_threshold: Optional[float] = None,
+    ):
+        """이력서 파일(multipart) 제출 — 즉시 job_id 목록 반환"""
+        job_ids = []
+        for f in files:
+            job_ids.append(request.app.state.jobs.submit({
+                "chat_id": chat_id, "resume_bytes": await f.read(), "resume_name": f.filename,
+                "dedup_threshold": dedup_threshold,
+            }))
+        return {"job_ids": job_ids}
+
+    @app.post("/sessions/{chat_id}/screenings/stream")
+    async def submit_stream(chat_id: str, request: Request, dedup_threshold: Optional[float] = None):
+        """
+        NDJSON 스트림 제출 — 한 줄에 {"name": 파일명, "content_b64": base64 내용}
+        본문 전체를 기다리지 않고 줄이 도착하는 대로 큐에 넣는다.
+        잘못된 줄은 건너뛰고 errors에 (줄 번호, 사유)로 보고한다 — 이미 큐에 들어간 job_id는 항상 반환.
+        """
+        job_ids, errors, buf, line_no = [], [], b"", 0
+
+        def submit(line: bytes) -> None:
+            try:
+                job_ids.append(_submit_line(request.app.state.jobs, chat_id, line, dedup_threshold))
+            except ValueError as e:
+                errors.append({"line": line_no, "error": str(e)})
+
+        async for chunk in request.stream():
+            buf += chunk
+            *lines, buf = buf.split(b"\n")
+            for line in lines:
+                line_no += 1
+                if line.strip():
+                    submit(line)
+        if buf.strip():
+            line_no += 1
+            submit(buf)
+        return {"job_ids": job_ids, "errors": errors}
+
+    def _submit_line(jobs: ScreeningQueue, chat_id: str, line: bytes, dedup_threshold: Optional[float]) -> str:
+        """NDJSON 한 줄을 검증하고 큐에 넣는다 — 잘못된 항목은 ValueError"""
+        try:
+            item = json.loads(line)
+            data = base64.b64decode(item["content_b64"])
+            name = item.get("name", "resume.txt")
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"잘못된 NDJSON 항목: {e!r}") from e
+        return jobs.submit({
+            "chat_id": chat_id, "resume_bytes": data, "resume_name": name,
+            "dedup_threshold": dedup_threshold,
+        })
+
+    @app.post("/match")
+    async def match_positions(request: Request, chat_ids: List[str] = Query(...), file: UploadFile = File(...)):
+        """
+        이력서 1건을 여러 포지션(세션)에 매칭 — 추출 1회, 포지션별 평가는 병렬
+        예: POST /match?chat_ids=backend&chat_ids=data (multipart file)
+        """
+        state = await request.app.state.multi.ainvoke({
+            "chat_ids": chat_ids, "resume_bytes": await file.read(), "resume_name": file.filename,
+        })
+        return {"resume": file.filename, "positions": state.get("positions", [])}
+
+    @app.get("/jobs/{job_id}")
+    async def get_job(job_id: str, request: Request):
+        job = request.app.state.jobs.jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="job을 찾을 수 없습니다.")
+        return job
+
+    @app.get("/sessions/{chat_id}/duplicates")
+    async def duplicates(chat_id: str):
+        """중복으로 평가를 건너뛴 이력서 리포트"""
+        return {"chat_id": chat_id, "skipped": await asyncio.to_thread(duplicate_report, chat_id)}
+
+    @app.get("/stats")
+    async def stats(request: Request):
+        return request.app.state.jobs.stats()
+
+    return app
+
+
+# ------------------- CLI -------------------
+def run_batch_cli(
+    chat_id: str,
+    resumes: List[str],
+    job: Optional[str],
+    concurrency: int,
+    out: Optional[str],
+    top_k: Optional[int] = None,
+    min_similarity: Optional[float] = None,
+    dedup_threshold: Optional[float] = None,
+) -> int:
+    """
+    CLI 일괄 평가 — 완료 순서대로 JSONL 한 줄씩 출력
+    - top_k / min_similarity를 주면 벡터 사전 선별을 통과한 이력서만 LLM으로 평가한다.
+    - dedup_threshold를 주면 유사 중복 이력서는 대표 이력서의 결과를 재사용한다 (duplicate_of 필드).
+    """
+    if job:
+        create_or_reset_session(chat_id=chat_id, job_file_path=job)
+    compiled = build_graph()
+    inputs = [
+        {"chat_id": chat_id, "resume_path": p, "resume_name": Path(p).name, "dedup_threshold": dedup_threshold}
+        for p in resumes
+    ]
+
+    sink = open(out, "w", encoding="utf-8") if out else sys.stdout
+    errors = 0
+
+    def emit(row: Dict[str, Any]) -> None:
+        sink.write(json.dumps(row, ensure_ascii=False) + "\n")
+        sink.flush()
+
+    try:
+        if top_k is not None or min_similarity is not None:
+            passed, rejected = shortlist(chat_id, inputs, top_k=top_k, min_similarity=min_similarity)
+            for idx, state in rejected.items():
+                save_result(chat_id, inputs[idx]["resume_name"], state)
+                emit({"file": inputs[idx]["resume_name"], **to_decision(state), "similarity": state["similarity"]})
+            inputs = [inputs[i] for i in passed]
+
+        for idx, state, err in iter_batch(compiled, inputs, max_concurrency=concurrency):
+            row = {"file": inputs[idx]["resume_name"]}
+            if err is not None:
+                errors += 1
+                row.update(decision="ERROR", error=str(err))
+                save_result(chat_id, row["file"], {"decision": "ERROR", "reasons": [str(err)]})
+            else:
+                row.update(to_decision(state))
+                if "similarity" in inputs[idx]:
+                    row["similarity"] = inputs[idx]["similarity"]
+                if state.get("duplicate_of"):
+                    row["duplicate_of"] = state["duplicate_of"]
+                save_result(chat_id, row["file"], state)
+            emit(row)
+    finally:
+        if out:
+            sink.close()
+    return 1 if errors else 0
+
+
+def run_match_cli(chat_ids: List[str], resume: str, out: Optional[str]) -> int:
+    """CLI 다중 포지션 매칭 — 종합 점수 순 포지션 목록을 JSON으로 출력"""
+    state = build_multi_position_graph().invoke({
+        "chat_ids": chat_ids, "resume_path": resume, "resume_name": Path(resume).name,
+    })
+    text = json.dumps({"resume": Path(resume).name, "positions": state.get("positions", [])}, ensure_ascii=False, indent=2)
+    if out:
+        Path(out).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="HR AI Screening — 헤드리스 서비스/CLI")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    sp = sub.add_parser("serve", help="비동기 HTTP API 실행")
+    sp.add_argument("--host", default="127.0.0.1")
+    sp.add_argument("--port", type=int, default=8000)
+    sp.add_argument("--workers", type=int, default=DEFAULT_MAX_CONCURRENCY, help="동시 평가 워커 수")
+
+    bp = sub.add_parser("batch", help="이력서 파일 일괄 평가 (JSONL 출력)")
+    bp.add_argument("--chat-id", required=True)
+    bp.add_argument("--job", help="채용 공고 파일 (지정 시 세션을 생성/갱신)")
+    bp.add_argument("--concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    bp.add_argument("--out", help="결과 JSONL 경로 (기본: stdout)")
+    bp.add_argument("--top-k", type=int, help="벡터 사전 선별: 공고 유사도 상위 K명만 LLM 평가")
+    bp.add_argument("--min-similarity", type=float, help="벡터 사전 선별: 이 유사도 미만은 NOT_SHORTLISTED")
+    bp.add_argument("--dedup-threshold", type=float, help="유사 중복 이력서 판정 유사도 (지정 시 대표 결과 재사용)")
+    bp.add_argument("resumes", nargs="+")
+
+    mp = sub.add_parser("match", help="이력서 1건을 여러 포지션(세션)에 매칭")
+    mp.add_argument("--chat-ids", nargs="+", required=True, help="매칭할 채용 공고 세션 목록")
+    mp.add_argument("--out", help="결과 JSON 경로 (기본: stdout)")
+    mp.add_argument("resume")
+
+    gp = sub.add_parser("gc-sessions", help="오래 사용되지 않은 세션 디렉터리 정리")
+    gp.add_argument("--max-age-days", type=float, default=SESSION_TTL_DAYS)
+    gp.add_argument("--dry-run", action="store_true", help="삭제하지 않고 대상만 출력")
+
+    args = ap.parse_args(argv)
+    if args.cmd == "serve":
+        import uvicorn
+        uvicorn.run(create_app(workers=args.workers), host=args.host, port=args.port)
+        return 0
+    if args.cmd == "match":
+        return run_match_cli(args.chat_ids, args.resume, args.out)
+    if args.cmd == "gc-sessions":
+        for chat_id in gc_sessions(args.max_age_days, dry_run=args.dry_run):
+            print(chat_id)
+        return 0
+    return run_batch_cli(
+        args.chat_id, args.resumes, args.job, args.concurrency, args.out, args.top_k, args.min_similarity,
+        args.dedup_threshold,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
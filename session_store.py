@@ -1,69 +1,223 @@
+import os
+import time
 from pathlib import Path
+from collections import OrderedDict
+from typing import List
 import shutil
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
+import threading
+import vector_index
+from langchain_core.documents import Document
+from job_profile import extract_job_profile
+from schemas import JobProfile
+from loader import load_pages, load_pages_from_path
+from llm_factory import get_embeddings
+from dedup import clear_session as clear_dedup_index
+from cache_store import DB_ROOT
+
+
+SESS_DB_ROOT = DB_ROOT / "sessions"
+SESS_DB_ROOT.mkdir(parents=True, exist_ok=True)
 
+# 세션 인덱스와 같은 폴더에 저장되는 요구사항 프로필 파일명
+PROFILE_FILE = "profile.json"
+
+EMBED_MODEL = "text-embedding-3-small"
+
+# 이 기간(일) 동안 생성/사용되지 않은 세션은 gc_sessions()가 삭제
+SESSION_TTL_DAYS = 30
+# 세션 사용 시 디렉터리 mtime 갱신 최소 간격(초) — 평가마다 파일 시스템을 건드리지 않도록
+TOUCH_INTERVAL_S = 3600
+
+# 세션별 인메모리 캐시 (LRU)
+# - chat_id -> {"db": 세션 인덱스(MmapIndex), "contexts": {query: 검색 결과 문자열}, "profile": JobProfile | None}
+#   (각 항목은 처음 필요할 때 채워진다)
+# - 세션 생성/리셋/종료 시 무효화된다.
+SESSION_CACHE_MAX = 16
+_session_cache: "OrderedDict[str, dict]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _load_docs(file_path: str = None, data: bytes = None, file_name: str = ""):
+    """PDF/TXT 파일 로더 (경로 또는 메모리 바이트) — 페이지당 Document 1개"""
+    if data is not None:
+        pages = load_pages(data, Path(file_name).suffix)
+    else:
+        pages = load_pages_from_path(file_path)
+    return [Document(page_content=text, metadata={"page": i}) for i, text in enumerate(pages)]
+
+
+def _get_embeddings():
+    """프로세스 단위로 공유하는 임베딩 클라이언트 (내용 해시 캐시 적용)"""
+    return get_embeddings(EMBED_MODEL)
+
+
+def _cache_entry(chat_id: str) -> dict:
+    """chat_id의 캐시 항목 반환 (없으면 빈 항목 생성) — 세션 사용 시각도 함께 갱신"""
+    with _cache_lock:
+        entry = _session_cache.get(chat_id)
+        if entry is not None:
+            _session_cache.move_to_end(chat_id)
+    if entry is None:
+        entry = {"contexts": {}}
+        _cache_put(chat_id, entry)
+    _touch(chat_id, entry)
+    return entry
+
+
+def _touch(chat_id: str, entry: dict):
+    """세션 디렉터리 mtime 갱신 (gc_sessions 기준, TOUCH_INTERVAL_S마다 최대 1회)"""
+    now = time.time()
+    if now - entry.get("touched", 0) < TOUCH_INTERVAL_S:
+        return
+    entry["touched"] = now
+    try:
+        os.utime(SESS_DB_ROOT / chat_id)
+    except FileNotFoundError:
+        pass
 
-ROOT = Path(__file__).resolve().parents[1]
-SESS_DB_ROOT = ROOT / "db" / "sessions"
-SESS_DB_ROOT.mkdir(parents=True, exist_ok=True)
+
+def _cache_put(chat_id: str, entry: dict):
+    with _cache_lock:
+        _session_cache[chat_id] = entry
+        _session_cache.move_to_end(chat_id)
+        while len(_session_cache) > SESSION_CACHE_MAX:
+            _session_cache.popitem(last=False)
 
 
-def _load_docs(file_path: str):
-    """PDF/TXT 파일 로더"""
-    p = Path(file_path)
-    if p.suffix.lower() == ".pdf":
-        return PyPDFLoader(str(p)).load()
-    return TextLoader(str(p), encoding="utf-8").load()
+def invalidate_session_cache(chat_id: str = None):
+    """세션 캐시 무효화 (chat_id가 없으면 전체 삭제)"""
+    with _cache_lock:
+        if chat_id is None:
+            _session_cache.clear()
+        else:
+            _session_cache.pop(chat_id, None)
 
 
-def create_or_reset_session(chat_id: str, job_file_path: str):
+def create_or_reset_session(chat_id: str, job_file_path: str = None, job_bytes: bytes = None, job_name: str = ""):
     """
     세션 생성 / 리셋
     ----------------------------------
-    채용 공고를 문서 조각으로 분할 → 임베딩 생성 → FAISS에 저장
+    채용 공고를 문서 조각으로 분할 → 임베딩 생성 → 메모리 매핑 인덱스(vectors.npy + docstore.json)로 저장
+    공고 전체에서 요구사항 프로필(JobProfile)을 1회 추출 → profile.json 저장
+    - 공고는 파일 경로(job_file_path) 또는 업로드 바이트(job_bytes + job_name)로 전달
     """
-    docs = _load_docs(job_file_path)
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    docs = _load_docs(job_file_path, job_bytes, job_name)
+    profile = extract_job_profile("\n".join(d.page_content for d in docs))
     splitter = RecursiveCharacterTextSplitter(chunk_size=900, chunk_overlap=200)
     chunks = splitter.split_documents(docs)
     for ch in chunks:
         ch.metadata = {"chat_id": chat_id}
 
     persist_dir = str(SESS_DB_ROOT / chat_id)
+    invalidate_session_cache(chat_id)
+    clear_dedup_index(chat_id)
     if Path(persist_dir).exists():
         shutil.rmtree(persist_dir, ignore_errors=True)
 
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+    # 🔹 원시 벡터(.npy) + JSON 문서 저장 — 워커 프로세스들이 메모리 매핑으로 공유
+    vectors, emb_stats = _get_embeddings().embed_documents_counted([c.page_content for c in chunks])
+    vector_index.save_index(persist_dir, vectors, chunks)
+    db = vector_index.MmapIndex.load(persist_dir, _get_embeddings())
+    (Path(persist_dir) / PROFILE_FILE).write_text(profile.model_dump_json(indent=2), encoding="utf-8")
+    _cache_put(chat_id, {"db": db, "contexts": {}, "profile": profile})
 
-    # 🔹 FAISS로 전환 — 로컬 서버 불필요
-    db = FAISS.from_documents(chunks, embeddings)
-    db.save_local(persist_dir)
+    return {
+        "chat_id": chat_id,
+        "persist_dir": persist_dir,
+        "profile": profile.model_dump(),
+        "embedding_cache": emb_stats,
+    }
 
-    return {"chat_id": chat_id, "persist_dir": persist_dir}
+
+def load_job_profile(chat_id: str):
+    """
+    세션 요구사항 프로필 로드 (없으면 None — 프로필 도입 이전에 만든 세션)
+    """
+    entry = _cache_entry(chat_id)
+    if "profile" not in entry:
+        path = SESS_DB_ROOT / chat_id / PROFILE_FILE
+        entry["profile"] = (
+            JobProfile.model_validate_json(path.read_text(encoding="utf-8")) if path.exists() else None
+        )
+    return entry["profile"]
 
 
 def retrieve_job_context(chat_id: str, query: str = "Evaluate candidate against this job"):
     """
-    🔍 채용 공고 문맥 검색 (FAISS)
+    🔍 채용 공고 문맥 검색 (세션 벡터 인덱스)
+    - 세션 동안 결과가 동일하므로 인덱스와 검색 결과를 chat_id별로 캐시한다.
     """
-    persist_dir = str(SESS_DB_ROOT / chat_id)
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+    entry = _cache_entry(chat_id)
+    if query in entry["contexts"]:
+        return entry["contexts"][query]
 
-    # allow_dangerous_deserialization=True → FAISS 안전하게 불러오기
-    db = FAISS.load_local(persist_dir, embeddings, allow_dangerous_deserialization=True)
-    hits = db.similarity_search(query, k=4)
-    return "\n\n".join([h.page_content for h in hits])
+    hits = _load_db(chat_id).similarity_search(query, k=4)
+    context = "\n\n".join([h.page_content for h in hits])
+    entry["contexts"][query] = context
+    return context
+
+
+def posting_vectors(chat_id: str):
+    """세션에 저장된 채용 공고 조각 임베딩 행렬 (n_chunks x dim, float32 읽기 전용)"""
+    return _load_db(chat_id).vectors
+
+
+def _load_db(chat_id: str):
+    """
+    세션 인덱스 (chat_id별 캐시)
+    - 읽기 전용 메모리 매핑으로 연다.
+    - 예전 형식(FAISS index.faiss + pickle docstore) 세션은 처음 열 때 새 형식으로 변환한다.
+    """
+    entry = _cache_entry(chat_id)
+    if "db" not in entry:
+        persist_dir = SESS_DB_ROOT / chat_id
+        if not vector_index.exists(persist_dir):
+            if not (persist_dir / "index.faiss").exists():
+                raise FileNotFoundError(f"세션을 찾을 수 없습니다: {chat_id}")
+            _migrate_legacy_index(persist_dir)
+        entry["db"] = vector_index.MmapIndex.load(persist_dir, _get_embeddings())
+    return entry["db"]
+
+
+def _migrate_legacy_index(persist_dir: Path):
+    """FAISS.save_local 형식 -> vectors.npy + docstore.json (pickle 파일은 삭제)"""
+    from langchain_community.vectorstores import FAISS
+
+    # allow_dangerous_deserialization=True → 이 서비스가 직접 저장한 파일만 1회 변환
+    db = FAISS.load_local(str(persist_dir), _get_embeddings(), allow_dangerous_deserialization=True)
+    ids = [db.index_to_docstore_id[i] for i in range(db.index.ntotal)]
+    vector_index.save_index(
+        persist_dir, db.index.reconstruct_n(0, db.index.ntotal), [db.docstore.search(i) for i in ids],
+    )
+    for name in ("index.faiss", "index.pkl"):
+        (persist_dir / name).unlink(missing_ok=True)
+
+
+def gc_sessions(max_age_days: float = SESSION_TTL_DAYS, dry_run: bool = False) -> List[str]:
+    """
+    오래 사용되지 않은 세션 디렉터리(db/sessions/*) 정리
+    - 마지막 생성/사용 시각(디렉터리 mtime)이 max_age_days보다 오래된 세션을 삭제한다.
+    - 반환: 삭제한(dry_run이면 삭제 대상) chat_id 목록
+    """
+    cutoff = time.time() - max_age_days * 86400
+    stale = [d for d in SESS_DB_ROOT.iterdir() if d.is_dir() and d.stat().st_mtime < cutoff]
+    if not dry_run:
+        for d in stale:
+            invalidate_session_cache(d.name)
+            clear_dedup_index(d.name)
+            shutil.rmtree(d, ignore_errors=True)
+    return [d.name for d in stale]
 
 
 def end_session(chat_id: str):
     """
     세션 종료 시 디스크 및 메모리 정리
+    - Streamlit 밖(헤드리스 서비스)에서 호출되면 Streamlit 상태 정리는 건너뜀
     """
-    import streamlit as st
-    from streamlit.runtime.caching import clear_cache
-
+    invalidate_session_cache(chat_id)
+    clear_dedup_index(chat_id)
     try:
         dirp = SESS_DB_ROOT / chat_id
         if dirp.exists():
@@ -72,6 +226,9 @@ def end_session(chat_id: str):
         pass
 
     try:
+        import streamlit as st
+        from streamlit.runtime.caching import clear_cache
+
         st.session_state.clear()
         clear_cache()
     except Exception:
@@ -0,0 +1,85 @@
+"""
+벡터 사전 선별 (2단계 후보 퍼널)
+- 이력서를 한 번씩 임베딩하여 세션에 저장된 채용 공고 조각 벡터와의 유사도로 전체 후보를 순위화한다.
+- 상위 K명(또는 유사도 기준 이상)만 LLM 평가(extractor/scorer)로 보내고,
+  나머지는 유사도와 함께 NOT_SHORTLISTED로 기록한다.
+- 이력서는 loader의 PDF 프로세스 풀로 병렬 파싱하며, 텍스트는 입력에 저장하지 않는다
+  (텍스트 캐시에 남으므로 loader 노드가 다시 파싱하지 않는다).
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from loader import load_resume_texts
+from compressor import compress_resume_text
+from session_store import EMBED_MODEL, posting_vectors
+from llm_factory import get_embeddings
+
+NOT_SHORTLISTED = "NOT_SHORTLISTED"
+
+# 이력서 1건의 유사도 = 가장 가까운 공고 조각 TOP_CHUNKS개와의 코사인 유사도 평균
+TOP_CHUNKS = 3
+
+# 임베딩 입력 토큰 예산 (임베딩 모델 입력 한도 이내)
+EMBED_TOKEN_BUDGET = 2000
+
+
+def _normalize_rows(m: np.ndarray) -> np.ndarray:
+    m = np.asarray(m, dtype=np.float32)
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    return m / np.where(norms == 0, 1, norms)
+
+
+def similarity_scores(chat_id: str, texts: List[str]) -> np.ndarray:
+    """
+    세션 채용 공고와 이력서 텍스트들의 유사도 (len(texts),)
+    - 공고 조각 벡터로 FAISS 내적 인덱스를 만들고, 이력서 벡터 전체를 한 번에 검색한다.
+    """
+    import faiss
+
+    posting = _normalize_rows(posting_vectors(chat_id))
+    index = faiss.IndexFlatIP(posting.shape[1])
+    index.add(posting)
+
+    compact = [compress_resume_text(t, EMBED_TOKEN_BUDGET)[0] or t[:2000] for t in texts]
+    resumes = _normalize_rows(get_embeddings(EMBED_MODEL).embed_documents(compact))
+    sims, _ = index.search(resumes, min(TOP_CHUNKS, index.ntotal))
+    return sims.mean(axis=1)
+
+
+def shortlist(
+    chat_id: str,
+    inputs: List[Dict[str, Any]],
+    top_k: Optional[int] = None,
+    min_similarity: Optional[float] = None,
+) -> Tuple[List[int], Dict[int, Dict[str, Any]]]:
+    """
+    후보 퍼널 1단계
+    입력:
+        inputs: 그래프 입력 state 리스트 (resume_path 또는 resume_bytes)
+        top_k: 유사도 상위 K명만 통과 (None이면 제한 없음)
+        min_similarity: 이 유사도 미만은 탈락 (None이면 제한 없음)
+    출력:
+        (통과한 입력 인덱스 리스트 — 유사도 높은 순,
+         {탈락 인덱스: NOT_SHORTLISTED 결과 state})
+        통과한 입력에는 similarity가 채워진다 (경로/파일명만 유지 — 배치 체크포인트에 텍스트를 저장하지 않음).
+    """
+    if not inputs:
+        return [], {}
+    texts = load_resume_texts(inputs)
+    sims = similarity_scores(chat_id, texts)
+    order = [int(i) for i in np.argsort(-sims, kind="stable")]
+
+    passed, rejected = [], {}
+    for rank, i in enumerate(order, start=1):
+        sim = round(float(sims[i]), 4)
+        if (top_k is not None and rank > top_k) or (min_similarity is not None and sim < min_similarity):
+            rejected[i] = {
+                "decision": NOT_SHORTLISTED,
+                "similarity": sim,
+                "reasons": [f"공고 유사도 {sim:.3f} (전체 {len(inputs)}명 중 {rank}위) — 사전 선별 기준 미달"],
+                "improvements": [],
+            }
+        else:
+            inputs[i]["similarity"] = sim
+            passed.append(i)
+    return passed, rejected
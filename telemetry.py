@@ -0,0 +1,233 @@
+import json
+import time
+import uuid
+import asyncio
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+import cache_store
+from cache_store import DB_ROOT
+
+TRACE_DIR = DB_ROOT / "traces"
+TRACE_FILE = TRACE_DIR / "screenings.jsonl"
+# 이 크기를 넘으면 screenings.jsonl.1로 교체(이전 백업은 삭제)하여 trace 파일이 무한히 커지지 않게 한다
+MAX_TRACE_BYTES = 50 * 2**20
+# load_traces가 파일 끝에서부터 한 번에 읽는 크기
+_TAIL_BLOCK = 1 << 16
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("hr_trace", default=None)
+_write_lock = threading.Lock()
+
+
+class Trace:
+    """
+    스크리닝 1건(그래프 호출 1회)의 계측 기록
+    - 노드별 소요 시간, LLM 토큰/비용, 캐시 hit/miss
+    """
+
+    def __init__(self, meta: Dict[str, Any]):
+        self.trace_id = uuid.uuid4().hex
+        self.meta = meta
+        self.started_at = time.time()
+        self.nodes: List[Dict[str, Any]] = []
+        self.cache: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def add_node(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self.nodes.append(record)
+
+    def add_cache(self, name: str, hit: bool) -> None:
+        with self._lock:
+            c = self.cache.setdefault(name, {"hits": 0, "misses": 0})
+            c["hits" if hit else "misses"] += 1
+
+    def to_dict(self, status: str, wall_ms: float) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "started_at": self.started_at,
+            "status": status,
+            "wall_ms": round(wall_ms, 2),
+            "prompt_tokens": sum(n["prompt_tokens"] for n in self.nodes),
+            "completion_tokens": sum(n["completion_tokens"] for n in self.nodes),
+            "cost_usd": sum(n["cost_usd"] for n in self.nodes),
+            "nodes": self.nodes,
+            "cache": self.cache,
+            **self.meta,
+        }
+
+
+def _record_cache(name: str, hit: bool) -> None:
+    trace = _current.get()
+    if trace is not None:
+        trace.add_cache(name, hit)
+
+
+# 모든 SQLiteCache 조회 결과를 현재 trace에 기록
+cache_store.lookup_hooks.append(_record_cache)
+
+
+def instrument_node(name: str, fn: Callable) -> Callable:
+    """그래프 노드 함수(동기/비동기)를 감싸 소요 시간과 LLM 토큰/비용을 현재 trace에 기록"""
+    if asyncio.iscoroutinefunction(fn):
+        @wraps(fn)
+        async def awrapper(state):
+            trace = _current.get()
+            if trace is None:
+                return await fn(state)
+            with _measure(trace, name):
+                return await fn(state)
+
+        return awrapper
+
+    @wraps(fn)
+    def wrapper(state):
+        trace = _current.get()
+        if trace is None:
+            return fn(state)
+        with _measure(trace, name):
+            return fn(state)
+
+    return wrapper
+
+
+@contextmanager
+def _measure(trace: "Trace", name: str):
+    from langchain_community.callbacks.manager import get_openai_callback
+
+    start = time.perf_counter()
+    with get_openai_callback() as cb:
+        try:
+            yield
+        finally:
+            trace.add_node({
+                "node": name,
+                "ms": round((time.perf_counter() - start) * 1000, 2),
+                "llm_calls": cb.successful_requests,
+                "prompt_tokens": cb.prompt_tokens,
+                "completion_tokens": cb.completion_tokens,
+                "cost_usd": cb.total_cost,
+            })
+
+
+def _write(record: Dict[str, Any]) -> None:
+    TRACE_DIR.mkdir(parents=True, exist_ok=True)
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _write_lock:
+        try:
+            if TRACE_FILE.stat().st_size > MAX_TRACE_BYTES:
+                TRACE_FILE.replace(TRACE_FILE.with_name(TRACE_FILE.name + ".1"))
+        except FileNotFoundError:
+            pass
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _trace_meta(inputs: Any) -> Dict[str, Any]:
+    if not isinstance(inputs, dict):
+        return {}
+    return {
+        "chat_id": inputs.get("chat_id"),
+        "resume": inputs.get("resume_name") or inputs.get("resume_path"),
+    }
+
+
+class TracedGraph:
+    """
+    컴파일된 그래프 래퍼
+    - invoke/ainvoke 1회마다 trace를 시작하고 종료 시 JSONL 한 줄로 기록
+    - 그 외 속성/메서드는 원본 그래프에 위임
+    """
+
+    def __init__(self, compiled):
+        self._compiled = compiled
+
+    def __getattr__(self, name):
+        return getattr(self._compiled, name)
+
+    def invoke(self, inputs, config=None, **kwargs):
+        trace = Trace(_trace_meta(inputs))
+        token = _current.set(trace)
+        start, status = time.perf_counter(), "ok"
+        try:
+            return self._compiled.invoke(inputs, config, **kwargs)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            _current.reset(token)
+            _write(trace.to_dict(status, (time.perf_counter() - start) * 1000))
+
+    async def ainvoke(self, inputs, config=None, **kwargs):
+        trace = Trace(_trace_meta(inputs))
+        token = _current.set(trace)
+        start, status = time.perf_counter(), "ok"
+        try:
+            return await self._compiled.ainvoke(inputs, config, **kwargs)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            _current.reset(token)
+            _write(trace.to_dict(status, (time.perf_counter() - start) * 1000))
+
+
+def load_traces(limit: int = 5000) -> List[Dict[str, Any]]:
+    """최근 trace 레코드 (최대 limit건) — 파일 끝에서부터 필요한 만큼만 읽는다"""
+    if not TRACE_FILE.exists():
+        return []
+    with open(TRACE_FILE, "rb") as f:
+        pos = f.seek(0, 2)
+        data = b""
+        while pos > 0 and data.count(b"\n") <= limit:
+            step = min(_TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.split(b"\n")
+    if pos > 0:
+        lines = lines[1:]  # 블록 경계에서 잘린 첫 줄
+    lines = [ln for ln in lines if ln.strip()][-limit:]
+    return [json.loads(ln) for ln in lines]
+
+
+def node_latency_summary(traces: List[Dict[str, Any]]) -> "pd.DataFrame":
+    """노드별 호출 수, p50/p95 소요 시간(ms), 평균 토큰"""
+    import pandas as pd
+
+    rows = [n for t in traces for n in t.get("nodes", [])]
+    if not rows:
+        return pd.DataFrame()
+    df = pd.DataFrame(rows)
+    df["tokens"] = df["prompt_tokens"] + df["completion_tokens"]
+    g = df.groupby("node")
+    out = pd.DataFrame({
+        "calls": g.size(),
+        "p50_ms": g["ms"].quantile(0.5),
+        "p95_ms": g["ms"].quantile(0.95),
+        "avg_tokens": g["tokens"].mean(),
+        "cost_usd": g["cost_usd"].sum(),
+    }).round(2)
+    return out.sort_values("p95_ms", ascending=False).reset_index()
+
+
+def screening_summary(traces: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """스크리닝 단위 집계 (건수, p50/p95 전체 시간, 이력서당 토큰/비용, 캐시 hit율)"""
+    if not traces:
+        return {}
+    import pandas as pd
+
+    df = pd.DataFrame(traces)
+    hits = sum(c["hits"] for t in traces for c in t.get("cache", {}).values())
+    lookups = hits + sum(c["misses"] for t in traces for c in t.get("cache", {}).values())
+    return {
+        "screenings": len(df),
+        "errors": int((df["status"] == "error").sum()),
+        "p50_ms": round(float(df["wall_ms"].quantile(0.5)), 2),
+        "p95_ms": round(float(df["wall_ms"].quantile(0.95)), 2),
+        "tokens_per_resume": round(float((df["prompt_tokens"] + df["completion_tokens"]).mean()), 1),
+        "cost_per_resume_usd": round(float(df["cost_usd"].mean()), 6),
+        "cache_hit_rate": round(hits / lookups, 3) if lookups else None,
+    }
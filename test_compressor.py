@@ -0,0 +1,44 @@
+from compressor import normalize_text
+from loader import PAGE_BREAK
+
+
+def test_years_on_own_line_are_kept():
+    """근무/졸업 연도만 있는 줄은 페이지 번호로 오인해 지우지 않는다 (years_experience 추출에 필요)"""
+    text = "\n".join([
+        "Jane Doe",
+        "Experience",
+        "Backend Engineer, Acme",
+        "2018",
+        "-",
+        "2023",
+        "Education",
+        "State University BS",
+        "2014",
+        "Skills",
+        "python sql",
+    ])
+    lines = normalize_text(text)
+    assert "2018" in lines
+    assert "2023" in lines
+    assert "2014" in lines
+
+
+def test_page_numbers_at_page_edges_are_removed():
+    page1 = "\n".join(["Jane Doe", "Experience", "Built APIs", "- 1 -"])
+    page2 = "\n".join(["Page 2 of 2", "Education", "State University BS", "2"])
+    lines = normalize_text(page1 + PAGE_BREAK + page2)
+    assert "- 1 -" not in lines
+    assert "Page 2 of 2" not in lines
+    assert "2" not in lines
+    assert "Built APIs" in lines
+
+
+def test_repeated_header_kept_on_first_page():
+    """2페이지부터 반복되는 머리글은 지우되 첫 페이지의 이름/연락처와 섹션 헤더는 남긴다"""
+    page1 = "\n".join(["Jane Doe | jane@x.com", "Experience", "Built APIs at Acme", "Skills"])
+    page2 = "\n".join(["Jane Doe | jane@x.com", "Skills", "python sql", "Education", "State University BS"])
+    lines = normalize_text(page1 + PAGE_BREAK + page2)
+    assert lines[0] == "Jane Doe | jane@x.com"
+    assert lines.count("Jane Doe | jane@x.com") == 1
+    for header in ("Experience", "Skills", "Education"):
+        assert header in lines
@@ -0,0 +1,44 @@
+import pandas as pd
+from prescore import ROUTE_LLM, ROUTE_PASS, ROUTE_REJECT, prescore_batch, route_batch
+from schemas import ResumeExtract
+
+
+def _scores(rows):
+    return pd.DataFrame(rows, columns=["total", "must_hits", "must_total", "years"])
+
+
+def test_route_batch_pass_boundary():
+    # threshold 70 + margin 15 = 85 이상, must-have 전부, 경력 min_years(2) + 1년 이상이어야 PASS
+    scores = _scores([
+        (85, 2, 2, 3.0),   # 경계값 그대로 → PASS
+        (84, 2, 2, 10.0),  # 점수 1점 부족 → LLM
+        (95, 1, 2, 10.0),  # must-have 일부 누락 → LLM
+        (95, 2, 2, 2.0),   # 최소 경력을 겨우 충족 → LLM
+        (95, 2, 2, 2.9),   # 경력 여유 부족 → LLM
+    ])
+    routes = route_batch(scores, threshold=70, margin=15, min_years=2.0)
+    assert list(routes) == [ROUTE_PASS, ROUTE_LLM, ROUTE_LLM, ROUTE_LLM, ROUTE_LLM]
+
+
+def test_route_batch_reject_boundary():
+    scores = _scores([
+        (55, 2, 2, 5.0),   # threshold - margin 경계값 → REJECT
+        (56, 2, 2, 5.0),   # 경계 안쪽 → LLM
+        (99, 0, 2, 10.0),  # must-have 하나도 없음 → 점수와 관계없이 REJECT
+    ])
+    routes = route_batch(scores, threshold=70, margin=15, min_years=2.0)
+    assert list(routes) == [ROUTE_REJECT, ROUTE_LLM, ROUTE_REJECT]
+
+
+def test_route_batch_without_min_years_ignores_experience():
+    scores = _scores([(85, 2, 2, 0.0)])
+    assert list(route_batch(scores, threshold=70, margin=15, min_years=0.0)) == [ROUTE_PASS]
+
+
+def test_no_min_years_does_not_inflate_total():
+    """최소 경력 요건이 없으면 경력 100점이 종합 점수를 끌어올리지 않는다"""
+    ex = ResumeExtract(name="a", summary="", years_experience=0, skills=["python"], education="", recent_companies=[], projects=[])
+    no_min = prescore_batch([ex], ["python", "sql"], [], 0.0).iloc[0]
+    assert no_min["experience_match"] == 100
+    # 스킬 (0.8*50 + 0.2*100)=60, 학력 40 → (0.4*60 + 0.3*40) / 0.7
+    assert no_min["total"] == round((0.4 * 60 + 0.3 * 40) / 0.7)
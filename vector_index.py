@@ -0,0 +1,62 @@
+"""
+메모리 매핑 세션 인덱스
+- 벡터는 float32 .npy 파일(원시 배열), 문서 조각은 JSON(docstore.json)으로 저장한다 (pickle 없음).
+- 읽기 전용 np.load(mmap_mode="r")로 열기 때문에 여러 워커 프로세스가 같은 파일을
+  OS 페이지 캐시로 공유하고, 프로세스마다 인덱스를 역직렬화/복사하지 않는다.
+- 검색은 FAISS IndexFlatL2와 같은 L2 거리 기준 전수 비교 (공고 조각 수는 수백 개 이하).
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+import numpy as np
+from langchain_core.documents import Document
+
+VECTORS_FILE = "vectors.npy"
+DOCSTORE_FILE = "docstore.json"
+
+
+def exists(persist_dir) -> bool:
+    d = Path(persist_dir)
+    return (d / VECTORS_FILE).exists() and (d / DOCSTORE_FILE).exists()
+
+
+def save_index(persist_dir, vectors: Sequence[Sequence[float]], docs: List[Document]) -> None:
+    """벡터 행렬과 문서 조각 저장"""
+    d = Path(persist_dir)
+    d.mkdir(parents=True, exist_ok=True)
+    np.save(d / VECTORS_FILE, np.asarray(vectors, dtype=np.float32))
+    (d / DOCSTORE_FILE).write_text(
+        json.dumps([{"page_content": doc.page_content, "metadata": doc.metadata} for doc in docs], ensure_ascii=False),
+        encoding="utf-8",
+    )
+
+
+class MmapIndex:
+    """
+    읽기 전용 세션 인덱스 (FAISS 벡터스토어의 similarity_search 대체)
+    - vectors: (n_chunks, dim) float32 memmap
+    """
+
+    def __init__(self, vectors: np.ndarray, docs: List[Dict[str, Any]], embeddings):
+        self.vectors = vectors
+        self.docs = docs
+        self.embeddings = embeddings
+        self._sq_norms = None
+
+    @classmethod
+    def load(cls, persist_dir, embeddings) -> "MmapIndex":
+        d = Path(persist_dir)
+        vectors = np.load(d / VECTORS_FILE, mmap_mode="r")
+        docs = json.loads((d / DOCSTORE_FILE).read_text(encoding="utf-8"))
+        return cls(vectors, docs, embeddings)
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        q = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        # |v - q|^2 = |v|^2 - 2 v·q + |q|^2 — 매핑된 벡터를 복사하지 않고 계산
+        if self._sq_norms is None:
+            self._sq_norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+        dists = self._sq_norms - 2 * (self.vectors @ q) + q @ q
+        k = min(k, len(dists))
+        top = np.argpartition(dists, k - 1)[:k] if k < len(dists) else np.arange(len(dists))
+        top = top[np.argsort(dists[top], kind="stable")]
+        return [Document(page_content=self.docs[i]["page_content"], metadata=self.docs[i]["metadata"]) for i in top]